@@ -0,0 +1 @@
+"""Micro benchmarks for LED controllers and pattern."""
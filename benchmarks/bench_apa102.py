@@ -0,0 +1,117 @@
+"""Frame path of the APA102 driver: old list based show() vs. frame buffer,
+per pixel brightness arithmetic vs. lookup tables and the cost per LED of
+long strips.
+
+    python -m benchmarks.bench_apa102
+"""
+from math import ceil
+
+from wyoming_satellite_led_event.led_controller.apa102 import APA102
+
+from .shared import FakeSpiDev, XferSpiDev, measure, report, transfers_per_frame
+
+
+class LegacyAPA102:
+    """show() as it was before the frame buffer."""
+
+    def __init__(self, num_led, spi):
+        self.num_led = num_led
+        self.global_brightness = APA102.MAX_BRIGHTNESS
+        self.rgb = [3, 2, 1]
+        self.leds = [APA102.LED_START, 0, 0, 0] * num_led
+        self.spi = spi
+
+    def set_pixel(self, led_num, red, green, blue, bright_percent=100):
+        if led_num < 0:
+            return
+        if led_num >= self.num_led:
+            return
+
+        brightness = int(ceil(bright_percent * self.global_brightness / 100.0))
+        ledstart = (brightness & 0b00011111) | APA102.LED_START
+
+        start_index = 4 * led_num
+        self.leds[start_index] = ledstart
+        self.leds[start_index + self.rgb[0]] = red
+        self.leds[start_index + self.rgb[1]] = green
+        self.leds[start_index + self.rgb[2]] = blue
+
+    def show(self):
+        self.spi.xfer2([0] * 4)
+        data = list(self.leds)
+        while data:
+            self.spi.xfer2(data[:32])
+            data = data[32:]
+        self.spi.xfer2([0xFF] * 4)
+
+
+def _fade(driver):
+    """One frame of a fade with changing brightness, pixel by pixel"""
+    step = [0]
+
+    def fade():
+        step[0] = (step[0] + 1) % 100
+        for i in range(driver.num_led):
+            driver.set_pixel(i, 255, step[0], 0, step[0])
+
+    return fade
+
+
+def _bulk_fade(apa102):
+    colors = bytes(i % 256 for i in range(3 * apa102.num_led))
+    step = [0]
+
+    def fade():
+        step[0] = (step[0] + 1) % 100
+        apa102.set_pixels(colors, step[0])
+
+    return fade
+
+
+def main():
+    for num_led in (3, 12, 144):
+        spi = FakeSpiDev()
+        legacy = LegacyAPA102(num_led, spi)
+        fps, allocated = measure(legacy.show)
+        xfers = transfers_per_frame(spi, legacy.show)
+        report(f"legacy   {num_led:>4} LEDs", fps, allocated, xfers_per_frame=xfers)
+
+        spi = FakeSpiDev()
+        apa102 = APA102(num_led, spi=spi)
+        fps, allocated = measure(apa102.show)
+        xfers = transfers_per_frame(spi, apa102.show)
+        report(f"buffered {num_led:>4} LEDs", fps, allocated, xfers_per_frame=xfers)
+
+    print()
+    for num_led in (3, 12, 144):
+        fps, allocated = measure(_fade(LegacyAPA102(num_led, FakeSpiDev())))
+        report(f"arithmetic fade {num_led:>4} LEDs", fps, allocated)
+
+        fps, allocated = measure(_fade(APA102(num_led, spi=FakeSpiDev())))
+        report(f"lut fade        {num_led:>4} LEDs", fps, allocated)
+
+        fps, allocated = measure(_fade(APA102(num_led, gamma=2.2, spi=FakeSpiDev())))
+        report(f"lut gamma fade  {num_led:>4} LEDs", fps, allocated)
+
+        fps, allocated = measure(_bulk_fade(APA102(num_led, gamma=2.2, spi=FakeSpiDev())))
+        report(f"translate fade  {num_led:>4} LEDs", fps, allocated)
+
+    # the cost per frame should grow linearly with the strip length
+    print()
+    for num_led in (100, 1000, 10000):
+        for name, spi in (("writebytes2", FakeSpiDev()), ("xfer2", XferSpiDev())):
+            apa102 = APA102(num_led, spi=spi)
+            frame = _bulk_fade(apa102)
+
+            def show():
+                frame()
+                apa102.show()
+
+            fps, allocated = measure(show, frames=max(100, 1000000 // num_led))
+            xfers = transfers_per_frame(spi, apa102.show)
+            ns_per_led = 1e9 / fps / num_led
+            report(f"{name:<11} {num_led:>5} LEDs", fps, allocated, xfers_per_frame=xfers, ns_per_led=f"{ns_per_led:.1f}")
+
+
+if __name__ == "__main__":
+    main()
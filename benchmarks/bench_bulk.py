@@ -0,0 +1,50 @@
+"""Per pixel set_led_color() loop vs. bulk operations of the controllers.
+
+    python -m benchmarks.bench_bulk
+"""
+from wyoming_satellite_led_event.led_controller import mock
+from wyoming_satellite_led_event.led_controller.apa102 import Apa102LedController
+
+from .shared import FakeSpiDev, measure, report
+
+
+def _per_pixel_fill(controller):
+    def fill():
+        for i in range(controller.num_led):
+            controller.set_led_color(i, 255, 128, 0, 50)
+    return fill
+
+
+def _bulk_fill(controller):
+    def fill():
+        controller.fill(255, 128, 0, 50)
+    return fill
+
+
+def _set_colors(controller):
+    colors = bytes(range(256)) * (3 * controller.num_led // 256 + 1)
+    def set_colors():
+        controller.set_colors(colors, 50)
+    return set_colors
+
+
+def _load_frame(controller):
+    frame = controller.snapshot()
+    def load_frame():
+        controller.load_frame(frame)
+    return load_frame
+
+
+def main():
+    for name, create in (("apa102", lambda n: Apa102LedController(num_led=n, spi=FakeSpiDev())), ("mock", mock.LedController)):
+        for num_led in (3, 12, 1000):
+            controller = create(num_led)
+            frames = 100000 // num_led
+            for method in (_per_pixel_fill, _bulk_fill, _set_colors, _load_frame):
+                fps, allocated = measure(method(controller), frames)
+                report(f"{name:<6} {num_led:>4} LEDs {method.__name__.strip('_')}", fps, allocated)
+            controller.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Cost of flight recording per shown frame.
+
+    python -m benchmarks.bench_flight_recorder
+
+Recording should take a few microseconds per frame and allocate nothing.
+"""
+from wyoming_satellite_led_event.base import FlightRecorder
+from wyoming_satellite_led_event.base.flight_recorder import DEFAULT_SECONDS
+from wyoming_satellite_led_event.led_controller.apa102 import Apa102LedController
+
+from .shared import FakeSpiDev, measure, report
+
+FPS = 50
+
+
+def main():
+    for num_led in (12, 144, 1000):
+        controller = Apa102LedController(num_led=num_led, spi=FakeSpiDev())
+        frame = controller.frame
+        recorder = FlightRecorder(len(frame), DEFAULT_SECONDS * FPS, "/dev/null")
+
+        fps, allocated = measure(lambda: recorder.record(frame))
+        report(f"record {num_led:>4} LEDs", fps, allocated, us_per_frame=f"{1e6 / fps:.2f}")
+
+        # show() of a changing frame with and without recorder
+        def show():
+            controller.set_led_color(0, 255, 0, 0, 100 - controller.frames_shown % 2)
+            controller.show()
+
+        fps, allocated = measure(show)
+        report(f"show   {num_led:>4} LEDs", fps, allocated)
+        controller.flight_recorder = recorder
+        fps, allocated = measure(show)
+        report(f"show   {num_led:>4} LEDs recorded", fps, allocated)
+        controller.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Event loop wakeups and SPI writes per second while a state is shown.
+
+    python -m benchmarks.bench_idle [--seconds 3]
+
+Static states should go to zero wakeups once their picture is shown,
+animated ones (e.g. think) are listed for comparison.
+"""
+import argparse
+import asyncio
+import selectors
+
+from wyoming.event import Event
+
+from wyoming_satellite_led_event.base import LedPatternRunner
+from wyoming_satellite_led_event.led_controller.apa102 import Apa102LedController
+from wyoming_satellite_led_event.led_pattern import alexa, default
+
+from .shared import FakeSpiDev
+
+# events leading to the state
+STATES = {
+    "idle"         : ["satellite-connected"],
+    "disconnected" : ["satellite-connected", "satellite-disconnected"],
+    "think"        : ["satellite-connected", "detection", "voice-stopped"],
+}
+
+# time for the state to reach its picture
+SETTLE_TIME = 3.0
+
+
+class CountingSelector(selectors.DefaultSelector):
+    """Counts the wakeups of the event loop, i.e. returns of a blocking select()"""
+    wakeups = 0
+
+    def select(self, timeout=None):
+        result = super().select(timeout)
+        if timeout is None or timeout > 0:
+            self.wakeups += 1
+        return result
+
+
+async def _wakeups(selector, seconds):
+    wakeups = selector.wakeups
+    await asyncio.sleep(seconds)
+    return selector.wakeups - wakeups
+
+
+async def _measure(pattern, spi, selector, events, seconds):
+    # wakeups of the measurement itself
+    calibration = await _wakeups(selector, 0.1)
+
+    runner = LedPatternRunner(pattern)
+    runner.setup()
+    try:
+        for event_type in events:
+            await runner.handle_event(Event(event_type))
+        await asyncio.sleep(SETTLE_TIME)
+
+        spi.transfers = 0
+        spi.counting = True
+        wakeups = await _wakeups(selector, seconds)
+        spi.counting = False
+        return (wakeups - calibration) / seconds, spi.transfers / seconds
+    finally:
+        runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    for module in (default, alexa):
+        for state, events in STATES.items():
+            spi = FakeSpiDev()
+            pattern = module.LedPattern(led_controller=Apa102LedController(num_led=12, spi=spi))
+            selector = CountingSelector()
+            loop = asyncio.SelectorEventLoop(selector)
+            try:
+                wakeups, writes = loop.run_until_complete(_measure(pattern, spi, selector, events, args.seconds))
+            finally:
+                loop.close()
+
+            name = f"{module.__name__.rsplit('.', 1)[-1]}/{state}"
+            print(f"{name:<24} {wakeups:>8.1f} wakeups/s  {writes:>8.1f} SPI writes/s")
+
+
+if __name__ == "__main__":
+    main()
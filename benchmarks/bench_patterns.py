@@ -0,0 +1,189 @@
+"""Cost of the pattern states, run with virtual time against a recording controller.
+
+    python -m benchmarks.bench_patterns [--json results.json] [--baseline baseline.json]
+
+Every state runs for up to DURATION simulated seconds. With --baseline the
+CPU time and allocations per frame are compared with a saved --json file,
+the exit code is 1 if one got worse by more than --threshold.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import pkgutil
+import sys
+import time
+import tracemalloc
+
+from wyoming_satellite_led_event import led_pattern
+from wyoming_satellite_led_event.base import FrameCompositor, RecordingLedController, VirtualTimeEventLoop, DEFAULT_FPS
+from wyoming_satellite_led_event.led_controller import mock
+
+STATES = ("wakeup", "listen", "think", "speak", "error", "disconnected", "idle")
+
+# simulated seconds per state
+DURATION = 10.0
+
+# runs per state
+REPEAT = 5
+
+
+def patterns():
+    """Yields (name, pattern class) of all patterns which need no options"""
+    for module in pkgutil.iter_modules(led_pattern.__path__):
+        cls = importlib.import_module(f"{led_pattern.__name__}.{module.name}").LedPattern
+        try:
+            cls(led_controller=mock.LedController(sink="count"))
+        except TypeError:
+            continue
+        yield module.name, cls
+
+
+class AllocationCounter:
+    """Sums the memory allocated between two frames with tracemalloc.
+
+    The peak is reset after every frame, the increase of the peak over the
+    memory in use at the reset is what the frame allocated, even if it was
+    freed again. peak is the highest memory in use above the start.
+    """
+
+    def __init__(self):
+        tracemalloc.start()
+        self.start = self.__mark = tracemalloc.get_traced_memory()[0]
+        self.allocated = 0
+        self.peak      = 0
+
+    def flushed(self, now, duration):
+        current, peak = tracemalloc.get_traced_memory()
+        self.allocated += peak - self.__mark
+        self.peak = max(self.peak, peak - self.start)
+        tracemalloc.reset_peak()
+        self.__mark = current
+
+    def stop(self):
+        self.flushed(None, None)
+        tracemalloc.stop()
+
+
+async def _run_state(pattern, name, fps, trace):
+    """Runs the state for DURATION simulated seconds, returns (CPU time, AllocationCounter or None)"""
+    compositor = FrameCompositor(pattern.led_controller, fps)
+    pattern.frame_interval = compositor.interval
+    compositor.setup()
+    allocations = None
+    try:
+        if trace:
+            allocations = AllocationCounter()
+            compositor.flushed = allocations.flushed
+        cpu = time.process_time()
+        end = asyncio.get_running_loop().time() + DURATION
+
+        task = asyncio.create_task(getattr(pattern, name)())
+        done, _ = await asyncio.wait([task], timeout=DURATION)
+        if done:
+            # the last frame stays visible for the rest of the time
+            await asyncio.sleep(end - asyncio.get_running_loop().time())
+        else:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        cpu = time.process_time() - cpu
+        return cpu, allocations
+    finally:
+        if allocations:
+            allocations.stop()
+        compositor.cleanup()
+
+
+def run_state(cls, name, fps, trace=False):
+    controller = RecordingLedController(mock.LedController(sink="count"), record=False)
+    pattern = cls(led_controller=controller)
+
+    loop = VirtualTimeEventLoop()
+    try:
+        cpu, allocations = loop.run_until_complete(_run_state(pattern, name, fps, trace))
+    finally:
+        loop.close()
+
+    # per frame values are None for states which show no frame
+    frames = controller.frames_shown
+    return {
+        "frames_per_second"    : frames / DURATION,
+        "show_calls"           : controller.show_calls,
+        "pixel_writes"         : controller.pixel_writes,
+        "cpu_us_per_frame"     : cpu * 1e6 / frames if frames else None,
+        "alloc_bytes_per_frame": allocations.allocated / frames if allocations and frames else None,
+        "peak_bytes"           : allocations.peak if allocations else None,
+    }
+
+
+def benchmark(fps):
+    results = {}
+    for pattern_name, cls in patterns():
+        for state in STATES:
+            # the first run compiles and caches the animations, the fastest
+            # of the others is kept to reduce noise
+            run_state(cls, state, fps)
+            result = min((run_state(cls, state, fps) for _ in range(REPEAT)), key=lambda r: r["cpu_us_per_frame"] or 0.0)
+            traced = run_state(cls, state, fps, trace=True)
+            result["alloc_bytes_per_frame"] = traced["alloc_bytes_per_frame"]
+            result["peak_bytes"] = traced["peak_bytes"]
+            results[f"{pattern_name}/{state}"] = result
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Prints the change against baseline, returns the names which got worse"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key in ("cpu_us_per_frame", "alloc_bytes_per_frame"):
+            before, after = base.get(key), result[key]
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else 0.0
+            flag = ""
+            if change > threshold and after - before > 1:
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {key}")
+            print(f"{name:<24} {key:<22} {before:>10.1f} -> {after:>10.1f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def _format(value, spec):
+    return f"{'-' if value is None else format(value, spec):>8}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS)
+    parser.add_argument("--json", metavar="FILE", help="Write the results to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare with results written by --json")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change reported as regression")
+    args = parser.parse_args()
+
+    results = benchmark(args.fps)
+    for name, result in results.items():
+        print(
+            f"{name:<24} {result['frames_per_second']:>6.1f} frames/s"
+            f"  {result['show_calls']:>6} show  {result['pixel_writes']:>7} pixel writes"
+            f"  {_format(result['cpu_us_per_frame'], '.1f')} us/frame  {_format(result['alloc_bytes_per_frame'], '.0f')} B alloc/frame"
+            f"  {result['peak_bytes']:>8} B peak"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
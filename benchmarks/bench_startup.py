@@ -0,0 +1,70 @@
+"""Cold start: import time of the service and time until it logs "Ready".
+
+    python -m benchmarks.bench_startup [--led-pattern mock/default] [--runs 5]
+
+The import time is measured with python -X importtime, the slowest modules
+by their own import time are listed.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULE = "wyoming_satellite_led_event"
+
+
+def import_times(module):
+    """Returns {module: (self us, cumulative us)} of importing module in a new interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}.__main__"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def time_to_ready(led_pattern):
+    """Seconds from starting the service until it logs Ready"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", MODULE, "--uri", "tcp://127.0.0.1:0", "--led-pattern", led_pattern],
+        stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    try:
+        for line in process.stderr:
+            if "Ready" in line:
+                return time.perf_counter() - start
+        raise RuntimeError(f"{MODULE} exited without Ready")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--led-pattern", default="mock/default")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [import_times(MODULE) for _ in range(args.runs)]
+    total = statistics.median(times[f"{MODULE}.__main__"][1] for times in runs)
+    print(f"{'import ' + MODULE + '.__main__':<48} {total / 1000:8.1f} ms")
+
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:10]
+    for name, (own, _) in slowest:
+        print(f"  {name:<46} {own / 1000:8.1f} ms")
+
+    ready = statistics.median(time_to_ready(args.led_pattern) for _ in range(args.runs))
+    print(f"{'time to Ready (' + args.led_pattern + ')':<48} {ready * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Shared code for the benchmarks."""
+import time
+import tracemalloc
+
+
+class FakeSpiDev:
+    """Stand-in for spidev.SpiDev which only counts the transfers."""
+
+    def __init__(self):
+        self.max_speed_hz = 0
+        self.transfers = 0
+        # Counting allocates ints, so it is only enabled on demand
+        self.counting = False
+
+    def open(self, bus, device):
+        pass
+
+    def close(self):
+        pass
+
+    def xfer2(self, data):
+        if self.counting:
+            self.transfers += 1
+        return [0] * len(data)
+
+    def writebytes2(self, data):
+        if self.counting:
+            self.transfers += 1
+
+
+class XferSpiDev:
+    """FakeSpiDev of spidev < 3.5, which has no writebytes2."""
+
+    def __init__(self):
+        self.max_speed_hz = 0
+        self.transfers = 0
+        self.counting = False
+
+    def close(self):
+        pass
+
+    def xfer2(self, data):
+        if self.counting:
+            self.transfers += 1
+        return data
+
+
+def transfers_per_frame(spi, func):
+    spi.transfers = 0
+    spi.counting = True
+    try:
+        func()
+    finally:
+        spi.counting = False
+    return spi.transfers
+
+
+def measure(func, frames=10000):
+    """Returns (frames per second, bytes allocated per frame) for func."""
+    for _ in range(100):
+        func()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        func()
+    fps = frames / (time.perf_counter() - start)
+
+    return fps, _allocated(func) - _allocated(_noop)
+
+
+def _noop():
+    pass
+
+
+def _allocated(func, frames=100):
+    tracemalloc.start()
+    try:
+        func()  # warm up tracemalloc
+        allocated = 0
+        for _ in range(frames):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            func()
+            allocated += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+
+    return allocated / frames
+
+
+def report(name, fps, allocated, **extra):
+    columns = "".join(f"  {k}={v}" for k, v in extra.items())
+    print(f"{name:<32} {fps:>12.0f} frames/s  {allocated:>8.0f} B alloc/frame{columns}")
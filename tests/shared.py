@@ -1,6 +1,28 @@
 """Shared code for Wyoming satellite tests."""
+import time
+
 from wyoming.audio import AudioChunk
 
 AUDIO_CHUNK = AudioChunk(
     rate=16000, width=2, channels=1, audio=bytes([255] * 960)  # 30ms
 )
+
+
+class FakeSpiDev:
+    """Records the data written to a fake SPI device, each write takes delay seconds."""
+
+    def __init__(self, delay: float = 0):
+        self.max_speed_hz = 0
+        self.writes = []
+        self.delay = delay
+
+    def open(self, bus, device):
+        pass
+
+    def close(self):
+        pass
+
+    def writebytes2(self, data):
+        if self.delay:
+            time.sleep(self.delay)
+        self.writes.append(bytes(data))
@@ -0,0 +1,83 @@
+import asyncio
+
+from wyoming_satellite_led_event.base import Animation, Keyframe, RecordingLedController, VirtualTimeEventLoop
+from wyoming_satellite_led_event.base.animation import FrameTable, frame_table
+from wyoming_satellite_led_event.led_controller.mock import LedController
+from wyoming_satellite_led_event.led_pattern import alexa
+
+
+def test_hold_keyframes() -> None:
+    controller = LedController(num_led=2)
+    animation = Animation([
+        Keyframe(0.0, (255, 0, 0)),
+        Keyframe(0.5, ((0, 255, 0), (0, 0, 255, 50))),
+        Keyframe(1.0, (0, 0, 0)),
+    ])
+    table = animation.compile(controller)
+
+    assert table.durations == [0.5, 0.5, 0.0]
+    assert table.frames == [
+        bytes([255, 0, 0, 100] * 2),
+        bytes([0, 255, 0, 100, 0, 0, 255, 50]),
+        bytes([0, 0, 0, 100] * 2),
+    ]
+    # controller frame is restored
+    assert controller.snapshot() == bytes(8)
+
+
+def test_interpolation_and_loop() -> None:
+    controller = LedController(num_led=1)
+    animation = Animation(
+        [Keyframe(0.0, (0, 0, 0)), Keyframe(0.1, (100, 0, 0)), Keyframe(0.2, (0, 0, 0))],
+        loop=True,
+        interpolate=True,
+    )
+    table = animation.compile(controller, 0.025)
+
+    assert [f[0] for f in table.frames] == [0, 25, 50, 75, 100, 75, 50, 25]
+    assert abs(sum(table.durations) - 0.2) < 1e-9
+
+
+def test_frame_table_is_cached() -> None:
+    controller = LedController()
+    table = frame_table(("test", "speak"), alexa._speak, controller, 0.02)
+
+    assert frame_table(("test", "speak"), alexa._speak, controller, 0.02) is table
+    assert frame_table(("test", "speak"), alexa._speak, LedController(num_led=3), 0.02) is not table
+    # 1.02s at 50 fps, first frame white
+    assert len(table.frames) == 52
+    assert abs(sum(table.durations) - 1.02) < 1e-9
+    assert table.frames[0] == bytes([255, 255, 255, 100] * 12)
+
+
+def test_static_loop_returns() -> None:
+    controller = LedController(num_led=3)
+    table = Animation([Keyframe(0.0, (255, 0, 0)), Keyframe(1.0, (255, 0, 0))], loop=True).compile(controller)
+    assert len(table.frames) == 1
+
+    # a looping table with one frame shows it once and returns
+    asyncio.run(asyncio.wait_for(table.play(controller), 1.0))
+    assert tuple(controller.frame[:4]) == (255, 0, 0, 100)
+
+
+def test_play_skips_frames_at_lower_frame_rate() -> None:
+    loop = VirtualTimeEventLoop()
+    controller = RecordingLedController(LedController(num_led=1), loop.time)
+    # 1/64s per frame (exact in binary), the last one stays
+    table = FrameTable([bytes([i, 0, 0, 100]) for i in range(11)], [1 / 64] * 10 + [0.0], loop=False)
+
+    async def play(interval):
+        controller.frames.clear()
+        start = loop.time()
+        await table.play(controller, lambda: interval)
+        return loop.time() - start
+
+    try:
+        assert loop.run_until_complete(play(1 / 64)) == 10 / 64
+        assert [frame[0] for _, frame in controller.frames] == list(range(11))
+
+        # at a quarter of the frame rate every fourth frame, still ending on time
+        assert loop.run_until_complete(play(4 / 64)) == 10 / 64
+        assert [frame[0] for _, frame in controller.frames] == [0, 4, 8, 10]
+    finally:
+        loop.close()
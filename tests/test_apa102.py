@@ -0,0 +1,102 @@
+from wyoming_satellite_led_event.led_controller.apa102 import APA102
+
+from .shared import FakeSpiDev
+
+
+def test_show_single_write() -> None:
+    spi = FakeSpiDev()
+    apa102 = APA102(num_led=3, spi=spi)
+    apa102.set_pixel(1, 10, 20, 30, 100)
+    apa102.show()
+
+    assert spi.writes == [
+        bytes([0, 0, 0, 0])
+        + bytes([0xE0, 0, 0, 0, 0xFF, 30, 20, 10, 0xE0, 0, 0, 0])
+        + bytes([0xFF] * 4)
+    ]
+
+
+def test_rotate() -> None:
+    apa102 = APA102(num_led=3, spi=FakeSpiDev())
+    apa102.set_pixel(0, 1, 2, 3)
+    apa102.rotate(1)
+
+    assert bytes(apa102.leds[8:]) == bytes([0xFF, 3, 2, 1])
+
+
+def test_bulk_operations_match_set_pixel() -> None:
+    single = APA102(num_led=4, order="grb", spi=FakeSpiDev())
+    bulk = APA102(num_led=4, order="grb", spi=FakeSpiDev())
+
+    for i in range(4):
+        single.set_pixel(i, 3 * i, 3 * i + 1, 3 * i + 2, 50)
+    bulk.set_pixels(bytes(range(12)), 50)
+    assert bulk.frame == single.frame
+
+    for i in range(1, 3):
+        single.set_pixel(i, 7, 8, 9, 20)
+    bulk.set_pixel_range(1, 3, 7, 8, 9, 20)
+    assert bulk.frame == single.frame
+
+
+def test_brightness_and_gamma() -> None:
+    apa102 = APA102(num_led=2, gamma=(2.2, 1.0, 1.0), spi=FakeSpiDev())
+    apa102.set_pixel(0, 128, 128, 0, 100)
+    apa102.set_pixel(1, 255, 0, 0, 2)
+
+    # 2% of 31 brightness steps is 0.62, rounded up to 1 and the rest applied to the color
+    assert bytes(apa102.leds) == bytes([0xFF, 0, 128, 56, 0xE1, 0, 0, 158])
+
+
+def test_negative_brightness_is_not_cached() -> None:
+    apa102 = APA102(num_led=2, spi=FakeSpiDev())
+    apa102.set_pixel(0, 255, 255, 255, -1)
+    apa102.set_pixel(1, 255, 255, 255, 100)
+
+    # -1 must not replace the tables of 100%
+    assert bytes(apa102.leds[4:]) == bytes([0xFF, 255, 255, 255])
+
+
+class XferSpiDev:
+    """spidev < 3.5 without writebytes2"""
+
+    def __init__(self):
+        self.max_speed_hz = 0
+        self.writes = []
+
+    def close(self):
+        pass
+
+    def xfer2(self, data):
+        self.writes.append(bytes(data))
+        return data
+
+
+def test_long_strip(monkeypatch) -> None:
+    monkeypatch.setattr(APA102, "SPI_BUFFER_SIZE_PARAMETER", "/nonexistent")
+    spi = XferSpiDev()
+    apa102 = APA102(num_led=2000, spi=spi)
+    apa102.set_pixel(1999, 1, 2, 3)
+    apa102.show()
+
+    # num_led / 2 extra clock edges for the end frame
+    assert len(apa102.frame) == 4 + 4 * 2000 + 125
+    assert apa102.frame[-125:] == b"\xFF" * 125
+    assert bytes(apa102.leds[-4:]) == bytes([0xFF, 3, 2, 1])
+
+    # split into transfers of the kernel buffer size
+    assert [len(w) for w in spi.writes] == [4096, 4033]
+    assert b"".join(spi.writes) == apa102.frame
+
+
+def test_controller_options_from_strings() -> None:
+    from wyoming_satellite_led_event.led_controller.apa102 import LedController
+
+    spi = FakeSpiDev()
+    controller = LedController(num_led="100", max_speed_hz="4000000", gamma="2.2:1:1", spi=spi)
+    try:
+        assert controller.num_led == 100
+        assert spi.max_speed_hz == 4000000
+        assert controller.frame_format[-1] == (2.2, 1.0, 1.0)
+    finally:
+        controller.cleanup()
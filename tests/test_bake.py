@@ -0,0 +1,86 @@
+import asyncio
+
+from pathlib import Path
+
+from wyoming_satellite_led_event.base import RecordingLedController, VirtualTimeEventLoop
+from wyoming_satellite_led_event.bake import STATES, bake
+from wyoming_satellite_led_event.led_controller.mock import LedController
+from wyoming_satellite_led_event.led_pattern import alexa, baked, default
+
+
+def test_bake_and_read(tmp_path: Path) -> None:
+    path = tmp_path / "alexa.bin"
+    bake(lambda led_controller: alexa.LedPattern(led_controller=led_controller), LedController(), str(path), fps=50)
+
+    tables = baked.read_frame_tables(path.read_bytes())
+
+    assert not tables["wakeup"].loop
+    assert tables["idle"].frames == [bytes([0, 0, 0, 100] * 12)]
+
+    # looping states are cut to one period
+    speak = tables["speak"]
+    assert speak.loop
+    assert len(speak.frames) == 52
+    assert abs(sum(speak.durations) - 1.02) < 1e-5
+    assert bytes(speak.frames[0]) == bytes([255, 255, 255, 100] * 12)
+
+    pattern = baked.LedPattern(led_controller=LedController(), file=str(path))
+    assert pattern.led_controller.num_led == 12
+    pattern.cleanup()
+
+
+def live_durations(pattern, name):
+    """Durations of the frames of a finished state, shown until the state coroutine returned"""
+    loop = VirtualTimeEventLoop()
+    recorder = RecordingLedController(pattern.led_controller, loop.time)
+    pattern.led_controller = recorder
+    pattern.frame_interval = 0.02
+    try:
+        loop.run_until_complete(getattr(pattern, name)())
+        end = loop.time()
+    finally:
+        loop.close()
+
+    times = [t for t, _ in recorder.frames]
+    return [b - a for a, b in zip(times, times[1:] + [end])]
+
+
+def test_baked_durations_match_live_pattern(tmp_path: Path) -> None:
+    path = tmp_path / "default.bin"
+    bake(lambda led_controller: default.LedPattern(led_controller=led_controller), LedController(), str(path), fps=50)
+    tables = baked.read_frame_tables(path.read_bytes())
+
+    # the last frame is held until the state has finished
+    assert list(tables["wakeup"].durations) == [1.0]
+    assert abs(sum(tables["error"].durations) - 1.8) < 1e-5
+
+    for name in STATES:
+        if tables[name].loop:
+            continue
+        live = live_durations(default.LedPattern(led_controller=LedController()), name)
+        assert [round(d, 5) for d in tables[name].durations] == [round(d, 5) for d in live], name
+
+
+def test_baked_pattern_plays_every_state(tmp_path: Path) -> None:
+    path = tmp_path / "alexa.bin"
+    bake(lambda led_controller: alexa.LedPattern(led_controller=led_controller), LedController(), str(path), fps=50)
+    tables = baked.read_frame_tables(path.read_bytes())
+    # alexa.listen only passes
+    assert tables["listen"].frames == []
+
+    pattern = baked.LedPattern(led_controller=LedController(), file=str(path))
+    loop = VirtualTimeEventLoop()
+
+    async def play(name):
+        task = asyncio.create_task(getattr(pattern, name)())
+        await asyncio.wait([task], timeout=5.0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return task.cancelled() or task.exception()
+
+    try:
+        for name in STATES:
+            assert loop.run_until_complete(play(name)) in (True, None), name
+    finally:
+        loop.close()
+        pattern.cleanup()
@@ -0,0 +1,111 @@
+import threading
+
+from wyoming_satellite_led_event.base import CompositeLedController
+from wyoming_satellite_led_event.led_controller.apa102 import Apa102LedController
+from wyoming_satellite_led_event.led_controller.mock import LedController
+
+from .shared import FakeSpiDev
+
+
+class BlockingLedController(LedController):
+    """Mock controller whose write waits at barrier, if one is set"""
+
+    def __init__(self, num_led):
+        super().__init__(num_led=num_led)
+        self.barrier = None
+        self.written = []
+        self.done    = threading.Event()
+
+    def write(self, frame):
+        if self.barrier is not None:
+            self.barrier.wait(5.0)
+        self.written.append(bytes(frame))
+        self.done.set()
+
+
+def test_leds_are_numbered_across_controllers() -> None:
+    a, b = LedController(num_led=2), LedController(num_led=3)
+    composite = CompositeLedController([a, b])
+    try:
+        assert composite.num_led == 5
+
+        composite.set_led_color(1, 1, 2, 3)
+        composite.set_led_color(2, 4, 5, 6)
+        composite.set_led_color(5, 7, 8, 9)
+        assert a.snapshot() == bytes([0, 0, 0, 0, 1, 2, 3, 100])
+        assert b.snapshot() == bytes([4, 5, 6, 100] + [0] * 8)
+
+        composite.fill_range(1, 4, 255, 0, 0)
+        assert a.snapshot()[4:] == bytes([255, 0, 0, 100])
+        assert b.snapshot() == bytes([255, 0, 0, 100] * 2 + [0] * 4)
+
+        composite.set_colors(bytes(range(15)))
+        assert a.snapshot() == bytes([0, 1, 2, 100, 3, 4, 5, 100])
+        assert b.snapshot()[8:] == bytes([12, 13, 14, 100])
+
+        # one buffer for the joined frames
+        assert composite.frame is composite.frame
+        frame = composite.snapshot()
+        composite.fill(0, 0, 0)
+        composite.load_frame(frame)
+        assert composite.snapshot() == frame
+    finally:
+        composite.cleanup()
+
+
+def test_controllers_are_written_in_parallel() -> None:
+    a, b = BlockingLedController(4), BlockingLedController(4)
+    composite = CompositeLedController([a, b])
+    try:
+        # both writes only pass the barrier if they run at the same time
+        a.barrier = b.barrier = threading.Barrier(2)
+        composite.fill(255, 0, 0)
+        composite.show()
+        assert a.done.wait(5.0) and b.done.wait(5.0)
+        assert not a.barrier.broken
+
+        # only the changed controller is written
+        a.barrier = b.barrier = None
+        a.done.clear()
+        b.done.clear()
+        composite.set_led_color(5, 0, 255, 0)
+        composite.show()
+        assert b.done.wait(5.0)
+        assert len(a.written) == 1
+        assert len(b.written) == 2
+
+        # unchanged frames are skipped
+        composite.show()
+        assert composite.frames_skipped == 1
+
+        # after invalidate() every controller is written again
+        a.done.clear()
+        b.done.clear()
+        composite.invalidate()
+        composite.show()
+        assert a.done.wait(5.0) and b.done.wait(5.0)
+        assert a.written[-1] == a.snapshot()
+        assert b.written[-1] == b.snapshot()
+        assert len(a.written) == 2
+        assert len(b.written) == 3
+    finally:
+        composite.cleanup()
+
+
+def test_writers_of_the_controllers_are_used() -> None:
+    spis = [FakeSpiDev(), FakeSpiDev()]
+    controllers = [Apa102LedController(num_led=2, spi=spi) for spi in spis]
+    threads = threading.active_count()
+    composite = CompositeLedController(controllers)
+    try:
+        # no extra thread next to the FrameWriter of every APA102 controller
+        assert threading.active_count() == threads
+
+        composite.set_led_color(3, 255, 0, 0)
+        composite.show()
+    finally:
+        composite.cleanup()
+
+    # the writers write the pending frame before they stop
+    assert len(spis[0].writes) == 1
+    assert spis[1].writes[-1][8:12] == bytes([0xFF, 0, 0, 255])
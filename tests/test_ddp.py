@@ -0,0 +1,118 @@
+import socket
+
+import pytest
+
+from wyoming_satellite_led_event.led_controller import ddp as ddp_module
+from wyoming_satellite_led_event.led_controller.ddp import DDP, DDP_HEADER_SIZE, LedController
+
+
+def receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(1.0)
+    return sock
+
+
+def test_frame_is_split_into_packets() -> None:
+    sock = receiver()
+    ddp = DDP("127.0.0.1", 1000, port=sock.getsockname()[1])
+    try:
+        frame = bytes(i % 251 for i in range(3000))
+        ddp.write(frame)
+        packets = [sock.recv(2048) for _ in range(3)]
+    finally:
+        ddp.cleanup()
+        sock.close()
+
+    # 480 pixels per packet, only the last one is shown
+    assert [p[0] for p in packets] == [0x40, 0x40, 0x41]
+    assert [p[1] for p in packets] == [1, 1, 1]
+    assert [int.from_bytes(p[4:8], "big") for p in packets] == [0, 1440, 2880]
+    assert [int.from_bytes(p[8:10], "big") for p in packets] == [1440, 1440, 120]
+    assert b"".join(p[DDP_HEADER_SIZE:] for p in packets) == frame
+
+
+def test_controller_sends_frames() -> None:
+    sock = receiver()
+    controller = LedController("127.0.0.1", "4", port=str(sock.getsockname()[1]), fps="20")
+    try:
+        controller.set_led_color(1, 10, 20, 30)
+        controller.fill_range(2, 4, 200, 100, 0, 50)
+        controller.show()
+        assert sock.recv(2048)[DDP_HEADER_SIZE:] == bytes([0, 0, 0, 10, 20, 30, 100, 50, 0, 100, 50, 0])
+
+        controller.set_colors(bytes(range(12)))
+        controller.show()
+        packet = sock.recv(2048)
+        assert packet[1] == 2
+        assert packet[DDP_HEADER_SIZE:] == bytes(range(12))
+    finally:
+        controller.cleanup()
+        sock.close()
+
+
+def test_brightness_out_of_range() -> None:
+    sock = receiver()
+    controller = LedController("127.0.0.1", "3", port=str(sock.getsockname()[1]))
+    try:
+        controller.set_led_color(0, 255, 255, 255, -1)
+        controller.set_led_color(1, 255, 255, 255, 100)
+        controller.set_led_color(2, 100, 100, 100, 200)
+        assert controller.frame == bytes([0, 0, 0, 255, 255, 255, 200, 200, 200])
+    finally:
+        controller.cleanup()
+        sock.close()
+
+
+class FakeClock:
+    """time module of the ddp controller, sleep() only advances the clock"""
+
+    def __init__(self):
+        self.now    = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+def test_controller_is_rate_limited(monkeypatch) -> None:
+    clock = FakeClock()
+    monkeypatch.setattr(ddp_module, "time", clock)
+    sock = receiver()
+    controller = LedController("127.0.0.1", "4", port=str(sock.getsockname()[1]), fps="20")
+    try:
+        frame = bytearray(12)
+        controller.write(frame)
+        clock.now += 0.01
+        controller.write(frame)
+        clock.now += 0.2
+        controller.write(frame)
+    finally:
+        controller.cleanup()
+        sock.close()
+
+    # 20 fps: the second frame waits for the rest of the 50ms, the third not at all
+    assert clock.sleeps == [pytest.approx(0.04)]
+    assert controller.ddp.packets_sent == 3
+
+
+def test_long_strip_frames() -> None:
+    sock = receiver()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    ddp = DDP("127.0.0.1", 3000, port=sock.getsockname()[1])
+    frame = bytearray(9000)
+    try:
+        # one second of 3000 LEDs at 60 fps, 7 packets per frame
+        for _ in range(60):
+            ddp.write(frame)
+        assert ddp.packets_sent == 60 * 7
+        assert ddp.send_errors == 0
+        # sequence numbers 1 to 15
+        assert ddp.sequence == 15
+    finally:
+        ddp.cleanup()
+        sock.close()
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+from wyoming.event import Event
+
+from wyoming_satellite_led_event.base import AbstractLedPattern, FlightRecorder, GenericLedPattern, LedPatternRunner, VirtualTimeEventLoop
+from wyoming_satellite_led_event.led_controller import mock
+
+STATE = AbstractLedPattern.STATE
+
+
+def test_ring_buffer_keeps_last_frames(tmp_path) -> None:
+    recorder = FlightRecorder(2, 3, str(tmp_path / "frames.jsonl"))
+    for i in range(5):
+        recorder.state = i
+        recorder.record(bytes([i, i]))
+
+    assert len(recorder) == 3
+    assert [(state, frame) for _, state, frame in recorder.frames()] == [(2, b"\x02\x02"), (3, b"\x03\x03"), (4, b"\x04\x04")]
+
+
+def test_capacity_is_limited_by_bytes(tmp_path) -> None:
+    # 10 seconds at 50 fps of 10000 APA102 LEDs would take 20 MB
+    recorder = FlightRecorder(40008, 500, str(tmp_path / "frames.jsonl"), max_bytes=4 * 1024 * 1024)
+    assert recorder.capacity == 104
+
+
+def test_dump_replaces_links(tmp_path) -> None:
+    target = tmp_path / "target"
+    target.write_text("keep")
+    path = tmp_path / "frames.jsonl"
+    path.symlink_to(target)
+
+    recorder = FlightRecorder(1, 2, str(path))
+    recorder.record(b"\x01")
+
+    assert recorder.dump() == str(path)
+    assert target.read_text() == "keep"
+    assert not path.is_symlink()
+    assert path.stat().st_mode & 0o777 == 0o600
+    assert [json.loads(line)["frame"] for line in path.read_text().splitlines()] == ["01"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["frames.jsonl", "target"]
+
+
+class ColorPattern(GenericLedPattern):
+    async def idle(self) -> None:
+        self.led_controller.fill(0, 0, 255)
+        self.led_controller.show()
+
+    async def listen(self) -> None:
+        self.led_controller.fill(255, 0, 0)
+        self.led_controller.show()
+
+
+def test_dumped_on_runner_error(tmp_path) -> None:
+    path = tmp_path / "frames.jsonl"
+    controller = mock.LedController(num_led=2, sink="count")
+    pattern  = ColorPattern(controller)
+    recorder = FlightRecorder(len(controller.frame), 100, str(path))
+    loop = VirtualTimeEventLoop()
+
+    def state_changed(state):
+        if state == STATE.THINKING:
+            raise RuntimeError("broken")
+
+    async def run():
+        runner = LedPatternRunner(pattern, fps=50, flight_recorder=recorder)
+        runner.state_changed = state_changed
+        runner.setup()
+        try:
+            await runner.handle_event(Event("satellite-connected"))
+            await asyncio.sleep(1.0)
+            await runner.handle_event(Event("voice-started"))
+            await asyncio.sleep(1.0)
+            await runner.handle_event(Event("voice-stopped"))
+            await asyncio.sleep(1.0)
+        finally:
+            runner.cleanup()
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(e["state"], e["frame"]) for e in entries] == [
+        ("IDLE",      "0000ff64" * 2),
+        ("LISTENING", "ff000064" * 2),
+    ]
@@ -0,0 +1,61 @@
+import asyncio
+
+from wyoming_satellite_led_event.base import AbstractLedController, FrameCompositor, VirtualTimeEventLoop
+
+
+class CountingLedController(AbstractLedController):
+    def __init__(self) -> None:
+        super().__init__()
+        self.num_led = 1
+        self.writes = 0
+
+    def set_led_color(self, led_num, red, green, blue, bright_percent=100):
+        pass
+
+    def write_frame(self):
+        self.writes += 1
+
+
+def run_virtual(compositor, coroutine) -> None:
+    async def run():
+        compositor.setup()
+        try:
+            await coroutine
+        finally:
+            compositor.cleanup()
+
+    loop = VirtualTimeEventLoop()
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+
+def test_frame_rate_is_capped() -> None:
+    controller = CountingLedController()
+    compositor = FrameCompositor(controller, fps=20)
+
+    async def show():
+        # a pattern requesting 500 frames/s for 0.2s
+        for _ in range(100):
+            controller.show()
+            await asyncio.sleep(0.002)
+        await asyncio.sleep(compositor.interval)
+
+    run_virtual(compositor, show())
+
+    # 0.2s at 20 fps: the frames at 0, 0.05, 0.1 and 0.15 and the last one at 0.2
+    assert controller.writes == 5
+
+
+def test_no_writes_without_show() -> None:
+    controller = CountingLedController()
+    compositor = FrameCompositor(controller, fps=100)
+
+    async def show():
+        controller.show()
+        await asyncio.sleep(0.1)
+
+    run_virtual(compositor, show())
+
+    assert controller.writes == 1
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from wyoming_satellite_led_event.base import FrameCompositor, FrameRateGovernor, VirtualTimeEventLoop
+
+from .test_frame_compositor import CountingLedController
+
+
+def test_lag_halves_down_to_floor() -> None:
+    governor = FrameRateGovernor(50, 10, max_lag=0.01, recovery_time=1.0)
+
+    assert governor.update(0.0, 0.001) == pytest.approx(1 / 50)
+    assert governor.update(0.1, 0.05) == pytest.approx(1 / 25)
+    assert governor.update(0.2, 0.05) == pytest.approx(1 / 12.5)
+    assert governor.update(0.3, 0.05) == pytest.approx(1 / 10)
+    assert governor.update(0.4, 0.05) == pytest.approx(1 / 10)
+    assert governor.throttled == 3
+
+
+def test_restores_after_recovery_time() -> None:
+    governor = FrameRateGovernor(50, 10, max_lag=0.01, recovery_time=1.0)
+    governor.update(0.0, 0.05)
+    governor.update(0.1, 0.05)
+    assert governor.fps == 12.5
+
+    governor.update(0.2, 0.0)
+    governor.update(0.9, 0.0)
+    assert governor.fps == 12.5
+    governor.update(1.2, 0.0)
+    assert governor.fps == 25
+    governor.update(2.2, 0.0)
+    assert governor.fps == 50
+    assert governor.restored == 2
+
+
+def test_busy_loop_lowers_frame_rate() -> None:
+    loop       = VirtualTimeEventLoop()
+    controller = CountingLedController()
+    governor   = FrameRateGovernor(50, 10, recovery_time=0.2)
+    compositor = FrameCompositor(controller, 50, governor)
+    intervals  = []
+    compositor.interval_changed = intervals.append
+
+    async def animate(duration):
+        end = loop.time() + duration
+        while loop.time() < end:
+            controller.show()
+            await asyncio.sleep(0.005)
+
+    async def hog(duration):
+        # e.g. wake word detection, blocks the loop for 30ms at a time
+        # while a frame is requested
+        end = loop.time() + duration
+        while loop.time() < end:
+            controller.show()
+            loop.advance(0.03)
+            await asyncio.sleep(0.02)
+
+    async def run():
+        compositor.setup()
+        try:
+            await asyncio.gather(animate(0.5), hog(0.5))
+            assert compositor.interval == pytest.approx(1 / 10)
+
+            # the loop is free again
+            await animate(1.0)
+            assert compositor.interval == pytest.approx(1 / 50)
+        finally:
+            compositor.cleanup()
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    assert intervals[0] == pytest.approx(1 / 25)
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from wyoming_satellite_led_event.led_controller.apa102 import Apa102LedController
+
+from .shared import FakeSpiDev
+
+_SPI_DELAY = 0.05
+
+
+async def _max_loop_lag(duration: float) -> float:
+    loop = asyncio.get_running_loop()
+    max_lag = 0.0
+    end = loop.time() + duration
+    while loop.time() < end:
+        start = loop.time()
+        await asyncio.sleep(0.005)
+        max_lag = max(max_lag, loop.time() - start - 0.005)
+
+    return max_lag
+
+
+async def _animate(controller: Apa102LedController, duration: float) -> None:
+    loop = asyncio.get_running_loop()
+    end = loop.time() + duration
+    value = 0
+    while loop.time() < end:
+        value = (value + 1) % 256
+        controller.set_led_color(0, value, 0, 0)
+        controller.show()
+        await asyncio.sleep(0.002)
+
+
+@pytest.mark.asyncio
+async def test_slow_spi_does_not_block_event_loop() -> None:
+    spi = FakeSpiDev(delay=_SPI_DELAY)
+    controller = Apa102LedController(num_led=12, spi=spi)
+    try:
+        idle_lag = await _max_loop_lag(0.2)
+        lag, _ = await asyncio.gather(_max_loop_lag(0.5), _animate(controller, 0.5))
+    finally:
+        controller.cleanup()
+
+    writer = controller.writer
+    assert lag < idle_lag + _SPI_DELAY / 2
+    assert writer.frames_superseded > 0
+    assert writer.frames_written + writer.frames_superseded == writer.frames_posted
+    assert len(spi.writes) == writer.frames_written
+    # last frame is written on cleanup
+    assert spi.writes[-1] == bytes(controller.frame)
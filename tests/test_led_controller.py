@@ -0,0 +1,109 @@
+from wyoming_satellite_led_event.led_controller.mock import LedController
+
+
+def test_unchanged_frames_are_skipped(capsys) -> None:
+    controller = LedController(sink="print")
+    controller.set_led_color(0, 255, 0, 0)
+    controller.show()
+    controller.show()
+    controller.set_led_color(0, 255, 0, 0)
+    controller.show()
+
+    assert controller.frames_shown == 1
+    assert controller.frames_skipped == 2
+
+    controller.set_led_color(1, 0, 255, 0)
+    controller.show()
+    controller.invalidate()
+    controller.show()
+
+    assert controller.frames_shown == 3
+    assert controller.frames_skipped == 2
+    assert len(capsys.readouterr().out.splitlines()) == 3
+
+
+def test_bulk_operations() -> None:
+    controller = LedController()
+    controller.fill(1, 2, 3, 50)
+    controller.fill_range(10, 20, 4, 5, 6)
+    assert bytes(controller.frame) == bytes([1, 2, 3, 50] * 10 + [4, 5, 6, 100] * 2)
+
+    frame = controller.snapshot()
+    controller.set_colors(bytes(range(36)), 10)
+    assert bytes(controller.frame[:8]) == bytes([0, 1, 2, 10, 3, 4, 5, 10])
+
+    controller.load_frame(frame)
+    assert controller.snapshot() == frame
+
+
+def test_brightness_out_of_range() -> None:
+    controller = LedController(num_led=3, sink="count")
+    controller.set_led_color(0, 1, 2, 3, -1)
+    controller.set_led_color(1, 1, 2, 3, 300)
+    controller.set_led_color(2, 1, 2, 3, 50.5)
+    assert bytes(controller.frame) == bytes([1, 2, 3, 0, 1, 2, 3, 100, 1, 2, 3, 50])
+
+    controller.fill(1, 2, 3, 300)
+    assert bytes(controller.frame) == bytes([1, 2, 3, 100] * 3)
+
+    controller.set_colors(bytes(9), -5)
+    assert bytes(controller.frame) == bytes(12)
+
+
+def test_sinks(tmp_path) -> None:
+    from wyoming_satellite_led_event.led_controller.mock import read_frames
+
+    controller = LedController(num_led=2, sink="count")
+    controller.fill(1, 2, 3)
+    controller.show()
+    assert controller.sink.frames == 1
+
+    path = tmp_path / "frames.bin"
+    controller = LedController(num_led=2, sink="record", file=str(path))
+    controller.fill(1, 2, 3)
+    controller.show()
+    controller.fill(4, 5, 6, 50)
+    controller.show()
+    controller.cleanup()
+    assert [frame for _, frame in read_frames(path)] == [bytes([1, 2, 3, 100] * 2), bytes([4, 5, 6, 50] * 2)]
+
+
+def test_terminal_sink_is_rate_limited() -> None:
+    import io
+    from wyoming_satellite_led_event.led_controller.mock import TerminalSink
+
+    stream = io.StringIO()
+    sink = TerminalSink(2, fps=1, stream=stream)
+    sink.write(bytes([255, 0, 0, 100, 0, 255, 0, 50]))
+    sink.write(bytes([0, 0, 0, 100] * 2))
+
+    # the second frame is not drawn within the second
+    assert stream.getvalue() == "\r\x1b[38;2;255;0;0m● \x1b[38;2;0;127;0m●\x1b[0m\x1b[K"
+
+
+def test_terminal_sink_draws_pending_frame_of_a_thread() -> None:
+    import asyncio
+    import io
+    import threading
+    from wyoming_satellite_led_event.base import VirtualTimeEventLoop
+    from wyoming_satellite_led_event.led_controller.mock import TerminalSink
+
+    stream = io.StringIO()
+    loop = VirtualTimeEventLoop()
+
+    async def run():
+        sink = TerminalSink(1, fps=1, stream=stream)
+        # e.g. the FrameWriter of a CompositeLedController
+        writer = threading.Thread(target=lambda: (sink.write(bytes([255, 0, 0, 100])), sink.write(bytes([0, 255, 0, 100]))))
+        writer.start()
+        writer.join()
+        await asyncio.sleep(2.0)
+        sink.close()
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    # the second frame is drawn by the loop after the interval
+    assert stream.getvalue().split("\r")[1:] == ["\x1b[38;2;255;0;0m●\x1b[0m\x1b[K", "\x1b[38;2;0;255;0m●\x1b[0m\x1b[K\n"]
@@ -0,0 +1,261 @@
+import asyncio
+
+import pytest
+
+from wyoming.event import Event
+
+from wyoming_satellite_led_event.base import AbstractLedPattern, GenericLedPattern, LedPatternRunner, RecordingLedController, VirtualTimeEventLoop
+from wyoming_satellite_led_event.led_controller import mock
+from wyoming_satellite_led_event.base.led_pattern import (
+    DEFAULT_TRANSITIONS,
+    Transition,
+    compile_transitions,
+    parse_transition,
+)
+
+STATE = AbstractLedPattern.STATE
+
+
+class CallRecordingPattern(AbstractLedPattern):
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def idle(self) -> None:
+        self.calls.append("idle")
+
+    async def wakeup(self) -> None:
+        self.calls.append("wakeup")
+
+    async def listen(self) -> None:
+        self.calls.append("listen")
+
+    async def think(self) -> None:
+        self.calls.append("think")
+
+
+def test_compile_expands_any_state() -> None:
+    table = compile_transitions(DEFAULT_TRANSITIONS)
+
+    for state in STATE:
+        assert table[("detection", state)] == Transition(STATE.LISTENING, 0, "wakeup", 0.25)
+
+    # voice-started only starts listening from idle
+    assert ("voice-started", STATE.IDLE) in table
+    assert ("voice-started", STATE.THINKING) not in table
+
+
+def test_compile_overrides() -> None:
+    table = compile_transitions(
+        DEFAULT_TRANSITIONS,
+        {
+            ("detection", None)        : Transition(STATE.THINKING),
+            ("detection", STATE.IDLE)  : Transition(STATE.SPEAKING),
+            ("transcript", None)       : None,
+        },
+    )
+
+    assert table[("detection", STATE.IDLE)].state == STATE.SPEAKING
+    assert table[("detection", STATE.LISTENING)].state == STATE.THINKING
+    assert not any(event_type == "transcript" for event_type, _ in table)
+
+
+def test_parse_transition() -> None:
+    assert parse_transition("detection=listening,0.1,wakeup") == (("detection", None), Transition(STATE.LISTENING, 0.1, "wakeup"))
+    assert parse_transition("error=idle,0,error,0.5") == (("error", None), Transition(STATE.IDLE, 0, "error", 0.5))
+    assert parse_transition("voice-started@idle=listening") == (("voice-started", STATE.IDLE), Transition(STATE.LISTENING))
+    assert parse_transition("transcript=") == (("transcript", None), None)
+
+    with pytest.raises(KeyError):
+        parse_transition("detection=unknown")
+
+
+def test_unknown_hook_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        LedPatternRunner(CallRecordingPattern(), transitions={("detection", None): Transition(STATE.LISTENING, 0, "missing")})
+
+
+@pytest.mark.asyncio
+async def test_events_start_states() -> None:
+    pattern = CallRecordingPattern()
+    runner  = LedPatternRunner(pattern)
+    runner.setup()
+    try:
+        await runner.handle_event(Event("detection"))
+        await asyncio.sleep(0.05)
+        assert runner.state == STATE.LISTENING
+        assert pattern.calls == ["wakeup", "listen"]
+
+        # unknown events don't change the state
+        await runner.handle_event(Event("run-pipeline"))
+        await asyncio.sleep(0.05)
+        assert runner.state == STATE.LISTENING
+
+        # debounced: transcript right after voice-stopped skips thinking
+        await runner.handle_event(Event("voice-stopped"))
+        await runner.handle_event(Event("transcript"))
+        await asyncio.sleep(0.4)
+        assert runner.state == STATE.IDLE
+        assert pattern.calls == ["wakeup", "listen", "idle"]
+    finally:
+        runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_connections_share_one_runner() -> None:
+    from wyoming_satellite_led_event.event_handler import EventHandler
+
+    pattern = CallRecordingPattern()
+    runner  = LedPatternRunner(pattern, transitions={("detection", None): Transition(STATE.LISTENING, 0, "wakeup")})
+    runner.setup()
+    try:
+        await asyncio.sleep(0)
+        tasks = runner.metrics["tasks"]
+
+        for _ in range(20):
+            handler = EventHandler(runner, None, None, None)
+            assert runner.metrics["connections"] == 1
+            await handler.handle_event(Event("detection"))
+            await asyncio.sleep(0.01)
+            assert runner.state == STATE.LISTENING
+
+            # the connection is lost without satellite-disconnected
+            await handler.disconnect()
+            await asyncio.sleep(0.01)
+            assert runner.metrics["connections"] == 0
+            assert runner.state == STATE.DISCONNECTED
+
+        # the pattern task of the last state is the only one left
+        assert runner.metrics["tasks"] <= tasks + 1
+    finally:
+        runner.cleanup()
+
+
+class RedrawingPattern(GenericLedPattern):
+    """Redraws the same picture in every state until cancelled"""
+
+    async def idle(self) -> None:
+        while True:
+            self.led_controller.fill(255, 0, 0)
+            self.led_controller.show()
+            await self.sleep(0.02)
+
+
+def test_unchanged_state_is_parked() -> None:
+    loop = VirtualTimeEventLoop()
+    controller = RecordingLedController(mock.LedController(), loop.time, record=False)
+    pattern = RedrawingPattern(controller)
+
+    async def run():
+        runner = LedPatternRunner(pattern, fps=50)
+        runner.setup()
+        try:
+            await runner.handle_event(Event("satellite-connected"))
+            await asyncio.sleep(2.0)
+            shows = controller.show_calls
+            await asyncio.sleep(10.0)
+            return shows, runner.registry.render()
+        finally:
+            runner.cleanup()
+
+    try:
+        shows, metrics = loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    # one written frame, parked after 25 unchanged ones
+    assert controller.frames_shown == 1
+    assert controller.show_calls == shows == 26
+    assert "led_states_parked_total 1" in metrics
+
+
+class HoldingHookPattern(RedrawingPattern):
+    """Holds a static picture in the wakeup hook for longer than PARK_AFTER_FRAMES"""
+
+    def __init__(self, led_controller) -> None:
+        super().__init__(led_controller)
+        self.calls = []
+
+    async def wakeup(self) -> None:
+        self.calls.append("wakeup")
+        self.led_controller.fill(0, 0, 255)
+        for _ in range(50):
+            self.led_controller.show()
+            await self.sleep(0.02)
+        self.calls.append("wakeup done")
+
+    async def listen(self) -> None:
+        self.calls.append("listen")
+        await self.idle()
+
+
+def test_hook_is_not_parked() -> None:
+    loop = VirtualTimeEventLoop()
+    controller = RecordingLedController(mock.LedController(), loop.time, record=False)
+    pattern = HoldingHookPattern(controller)
+
+    async def run():
+        runner = LedPatternRunner(pattern, fps=50)
+        runner.setup()
+        try:
+            await runner.handle_event(Event("detection"))
+            await asyncio.sleep(5.0)
+            return runner.registry.render()
+        finally:
+            runner.cleanup()
+
+    try:
+        metrics = loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    # the state after the hook is parked, the hook is not
+    assert pattern.calls == ["wakeup", "wakeup done", "listen"]
+    assert controller.frames_shown == 2
+    assert "led_states_parked_total 1" in metrics
+
+
+class SlowHookPattern(CallRecordingPattern):
+    async def wakeup(self) -> None:
+        self.calls.append("wakeup")
+        await asyncio.sleep(5.0)
+
+    async def error(self) -> None:
+        self.calls.append("error")
+        await asyncio.sleep(5.0)
+
+
+def test_hooks_do_not_block_events() -> None:
+    loop = VirtualTimeEventLoop()
+    pattern = SlowHookPattern()
+    states  = []
+
+    async def run():
+        runner = LedPatternRunner(pattern)
+        runner.state_changed = lambda state: states.append((loop.time(), state))
+        runner.setup()
+        try:
+            await runner.handle_event(Event("detection"))
+            await asyncio.sleep(0.1)
+            # during the wakeup effect
+            await runner.handle_event(Event("voice-stopped"))
+            await asyncio.sleep(1.0)
+            await runner.handle_event(Event("error"))
+            await asyncio.sleep(0.1)
+            await runner.handle_event(Event("detection"))
+            await asyncio.sleep(1.0)
+        finally:
+            runner.cleanup()
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    # worst case: debounce of the new state or the minimum display time of the effect
+    assert [(round(t, 3), state) for t, state in states] == [
+        (0.0, STATE.LISTENING),
+        (0.35, STATE.THINKING),
+        (1.1, STATE.IDLE),
+        (1.6, STATE.LISTENING),
+    ]
+    assert pattern.calls == ["wakeup", "think", "error", "wakeup"]
@@ -0,0 +1,14 @@
+from wyoming_satellite_led_event.__main__ import split_led_pattern
+
+
+def test_split_led_pattern() -> None:
+    assert split_led_pattern("mock") == ("mock", "default")
+    assert split_led_pattern("mock/alexa") == ("mock", "alexa")
+    assert split_led_pattern("apa102:num_led=3+mock/alexa") == ("apa102:num_led=3+mock", "alexa")
+    assert split_led_pattern("mock/baked:file=/tmp/alexa.bin") == ("mock", "baked:file=/tmp/alexa.bin")
+
+
+def test_split_led_pattern_with_path_in_controller_options() -> None:
+    assert split_led_pattern("mock:sink=record,file=/tmp/x.bin") == ("mock:sink=record,file=/tmp/x.bin", "default")
+    assert split_led_pattern("mock:sink=record,file=/tmp/x.bin/alexa") == ("mock:sink=record,file=/tmp/x.bin", "alexa")
+    assert split_led_pattern("mock:sink=record,file=/tmp/x.bin/baked:file=/tmp/a.bin") == ("mock:sink=record,file=/tmp/x.bin", "baked:file=/tmp/a.bin")
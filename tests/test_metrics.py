@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from wyoming.event import Event
+
+from wyoming_satellite_led_event.base import AbstractLedController, GenericLedPattern, LedPatternRunner
+from wyoming_satellite_led_event.base.metrics import Histogram, Registry, serve_metrics
+
+
+class FrameLedController(AbstractLedController):
+    def __init__(self) -> None:
+        super().__init__()
+        self.num_led = 3
+        self._frame = bytearray(4 * self.num_led)
+
+    @property
+    def frame(self):
+        return self._frame
+
+    def set_led_color(self, led_num, red, green, blue, bright_percent=100):
+        self._frame[4 * led_num : 4 * led_num + 4] = bytes((red, green, blue, bright_percent))
+
+    def write_frame(self):
+        pass
+
+
+class FillPattern(GenericLedPattern):
+    async def wakeup(self) -> None:
+        pass
+
+    async def listen(self) -> None:
+        self.led_controller.fill(0, 0, 255)
+        self.led_controller.show()
+
+
+def test_histogram_render() -> None:
+    histogram = Histogram("latency_seconds", "Latency", (0.1, 1.0))
+    histogram.observe(0.05, transition="a")
+    histogram.observe(0.5, transition="a")
+    histogram.observe(5.0, transition="a")
+
+    assert histogram.count(transition="a") == 3
+    assert histogram.render().splitlines()[2:] == [
+        'latency_seconds_bucket{transition="a",le="0.1"} 1',
+        'latency_seconds_bucket{transition="a",le="1.0"} 2',
+        'latency_seconds_bucket{transition="a",le="+Inf"} 3',
+        'latency_seconds_sum{transition="a"} 5.55',
+        'latency_seconds_count{transition="a"} 3',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_event_latency() -> None:
+    runner = LedPatternRunner(FillPattern(FrameLedController()), fps=50)
+    runner.setup()
+    try:
+        await runner.handle_event(Event("detection"))
+        await asyncio.sleep(0.1)
+    finally:
+        runner.cleanup()
+
+    latency = runner.registry.metrics["led_event_latency_seconds"]
+    assert latency.count(transition="detection->listening") == 1
+    assert 'led_frames_total 1' in runner.registry.render()
+
+
+@pytest.mark.asyncio
+async def test_serve_metrics() -> None:
+    registry = Registry()
+    registry.register(Histogram("latency_seconds", "Latency", (0.1,))).observe(0.05)
+
+    server = await serve_metrics("tcp://127.0.0.1:0", registry)
+    try:
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+    finally:
+        server.close()
+
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert b'latency_seconds_count 1' in response
+
+
+@pytest.mark.asyncio
+async def test_serve_metrics_drops_silent_clients() -> None:
+    server = await serve_metrics("tcp://127.0.0.1:0", Registry(), timeout=0.05)
+    try:
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # no request, the server closes the connection without a response
+        response = await reader.read()
+        writer.close()
+    finally:
+        server.close()
+
+    assert response == b""
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from wyoming.event import Event
+
+from wyoming_satellite_led_event.base import GenericLedPattern, LedPatternRunner, Profiler, VirtualTimeEventLoop
+from wyoming_satellite_led_event.led_controller import mock
+
+
+class BusyPattern(GenericLedPattern):
+    async def wakeup(self) -> None:
+        time.sleep(0.01)
+
+    async def listen(self) -> None:
+        for i in range(3):
+            self.led_controller.set_led_color(i, 255, 0, 0)
+            time.sleep(0.01)
+            await asyncio.sleep(0.1)
+        self.led_controller.show()
+
+
+def test_time_is_attributed_to_states_and_categories() -> None:
+    loop = VirtualTimeEventLoop()
+    profiler = Profiler()
+    pattern  = BusyPattern(mock.LedController(num_led=3, sink="count"))
+
+    async def run():
+        runner = LedPatternRunner(pattern, fps=50, profiler=profiler)
+        runner.setup()
+        try:
+            await runner.handle_event(Event("detection"))
+            await asyncio.sleep(1.0)
+        finally:
+            runner.cleanup()
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    totals = profiler.totals
+    assert totals[("wakeup", "pattern")][0] >= 0.01
+    assert totals[("LISTENING", "pattern")][0] >= 0.03
+    # called by the pattern, but not counted for it
+    assert totals[("LISTENING", "set_led_color")][2] == 3
+    assert totals[("LISTENING", "set_led_color")][0] < 0.01
+    assert totals[("LISTENING", "show")][2] >= 1
+    assert ("DISCONNECTED", "events") in totals
+    assert "LISTENING" in profiler.report()
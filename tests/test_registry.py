@@ -0,0 +1,28 @@
+import importlib
+
+import pytest
+
+from wyoming_satellite_led_event import registry
+
+
+def test_included_are_loaded() -> None:
+    assert registry.load(registry.LED_PATTERN, "alexa").__module__ == "wyoming_satellite_led_event.led_pattern.alexa"
+    with pytest.raises(LookupError):
+        registry.load(registry.LED_PATTERN, "no_such_pattern")
+    with pytest.raises(LookupError):
+        registry.load(registry.LED_PATTERN, "../alexa")
+
+
+def test_unlisted_module_in_the_package(tmp_path, monkeypatch) -> None:
+    # a module dropped into led_pattern/
+    (tmp_path / "rainbow_test.py").write_text("class LedPattern:\n    pass\n")
+    (tmp_path / "broken_test.py").write_text("import no_such_module_for_the_test\n")
+    package = importlib.import_module("wyoming_satellite_led_event.led_pattern")
+    monkeypatch.setattr(package, "__path__", [*package.__path__, str(tmp_path)])
+
+    assert registry.load(registry.LED_PATTERN, "rainbow_test").__name__ == "LedPattern"
+    assert "rainbow_test" in registry.available(registry.LED_PATTERN)
+
+    # a missing module of the pattern is not a missing pattern
+    with pytest.raises(ModuleNotFoundError):
+        registry.load(registry.LED_PATTERN, "broken_test")
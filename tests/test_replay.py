@@ -0,0 +1,51 @@
+from wyoming.event import Event
+
+from wyoming_satellite_led_event.base import AbstractLedPattern
+from wyoming_satellite_led_event.event_log import EventRecorder, read_events
+from wyoming_satellite_led_event.led_controller import mock
+from wyoming_satellite_led_event.led_pattern import default
+from wyoming_satellite_led_event.replay import replay
+
+STATE = AbstractLedPattern.STATE
+
+EVENTS = [
+    (100.0, Event("satellite-connected")),
+    (102.0, Event("run-pipeline", {"start_stage": "asr", "end_stage": "tts", "restart_on_end": False})),
+    (102.0, Event("detection", {"name": "jarvis", "timestamp": 49791777435851})),
+    (102.0, Event("streaming-started")),
+    (104.0, Event("voice-started", {"timestamp": 655})),
+    (105.0, Event("voice-stopped", {"timestamp": 1155})),
+    (107.0, Event("transcript", {"text": "nevermind"})),
+    (107.0, Event("streaming-stopped")),
+    (108.0, Event("audio-chunk", {"rate": 16000, "width": 2, "channels": 1}, payload=bytes(960))),
+]
+
+
+def test_record_and_read(tmp_path) -> None:
+    path = tmp_path / "events.jsonl"
+    recorder = EventRecorder(str(path))
+    for t, event in EVENTS:
+        recorder.record(t, event)
+    recorder.close()
+
+    events = list(read_events(str(path)))
+    assert [(t, e.type, e.data) for t, e in events] == [(t, e.type, e.data) for t, e in EVENTS]
+    assert '"payload":960' in path.read_text().splitlines()[-1]
+
+
+def test_replay_virtual(tmp_path) -> None:
+    path = tmp_path / "events.jsonl"
+    recorder = EventRecorder(str(path))
+    for t, event in EVENTS:
+        recorder.record(t, event)
+    recorder.close()
+
+    report = replay(default.LedPattern(led_controller=mock.LedController()), str(path), virtual=True)
+
+    assert report["events"] == len(EVENTS)
+    assert [(round(t, 3), state) for t, state in report["states"]] == [
+        (0.25, STATE.IDLE), (2.0, STATE.LISTENING), (5.25, STATE.THINKING), (7.25, STATE.IDLE),
+    ]
+    assert report["frames_shown"] == 5
+    assert report["event_wait"]["detection"][0] == 1
+    assert report["event_processing"]["detection"][0] == 1
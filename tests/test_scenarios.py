@@ -0,0 +1,55 @@
+import pytest
+
+from wyoming_satellite_led_event.base import AbstractLedPattern
+from wyoming_satellite_led_event.led_controller import mock
+from wyoming_satellite_led_event.led_controller.apa102 import Apa102LedController
+from wyoming_satellite_led_event.led_pattern import alexa, default
+from wyoming_satellite_led_event.test_pattern import fast_forward
+
+from .shared import FakeSpiDev
+
+STATE = AbstractLedPattern.STATE
+
+CONTROLLERS = {
+    "mock"   : lambda: mock.LedController(num_led=12),
+    "apa102" : lambda: Apa102LedController(num_led=12, spi=FakeSpiDev()),
+}
+
+PATTERNS = [default, alexa]
+
+# state changes of the scenarios of test_pattern, one-shot effects don't delay them
+STATES = [
+    (0.25, STATE.IDLE), (3.0, STATE.LISTENING), (7.25, STATE.THINKING), (12.25, STATE.SPEAKING),
+    (14.25, STATE.IDLE), (17.0, STATE.IDLE), (22.0, STATE.LISTENING), (26.25, STATE.THINKING),
+    (31.25, STATE.IDLE), (36.0, STATE.DISCONNECTED),
+]
+
+_BLACK, _RED, _BLUE, _YELLOW, _GREEN = (0, 0, 0), (255, 0, 0), (0, 0, 255), (255, 255, 0), (0, 255, 0)
+
+
+def _rounded(log):
+    return [(round(t, 6), value) for t, value in log]
+
+
+@pytest.mark.parametrize("controller", CONTROLLERS)
+@pytest.mark.parametrize("pattern", PATTERNS, ids=lambda module: module.__name__.rsplit(".", 1)[-1])
+def test_scenarios(pattern, controller) -> None:
+    states, frames = fast_forward(pattern.LedPattern(led_controller=CONTROLLERS[controller]()))
+
+    # 36 seconds of virtual time, exact to the microsecond
+    assert _rounded(states) == _rounded(STATES)
+
+    # deterministic frame log, ordered by time
+    assert frames
+    assert [t for t, _ in frames] == sorted(t for t, _ in frames)
+    assert _rounded(frames) == _rounded(fast_forward(pattern.LedPattern(led_controller=CONTROLLERS[controller]()))[1])
+
+
+def test_default_frames() -> None:
+    _, frames = fast_forward(default.LedPattern(led_controller=mock.LedController(num_led=3)))
+
+    assert _rounded((t, tuple(frame[:3])) for t, frame in frames) == _rounded([
+        (0.25, _BLACK), (3.0, _BLUE), (4.0, _YELLOW), (7.25, _GREEN), (12.25, _BLACK),
+        (17.0, _RED), (17.3, _BLACK), (17.6, _RED), (17.9, _BLACK), (18.2, _RED), (18.5, _BLACK),
+        (22.0, _BLUE), (23.0, _YELLOW), (26.25, _GREEN), (31.25, _BLACK), (36.0, _RED),
+    ])
@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+
+from wyoming_satellite_led_event.base.shared_frame import SharedFrameBuffer, SharedFrameReader
+from wyoming_satellite_led_event.led_controller.mock import LedController
+
+FRAME_SIZE = 4096
+
+
+def _publish(name, count, created, done):
+    # every byte of a frame is the number of the frame
+    shared_frame = SharedFrameBuffer(name, FRAME_SIZE, FRAME_SIZE // 4)
+    created.set()
+    try:
+        frames = [bytes([i % 256]) * FRAME_SIZE for i in range(256)]
+        for i in range(1, count + 1):
+            shared_frame.publish(frames[i % 256])
+    finally:
+        done.wait(10.0)
+        shared_frame.close()
+
+
+def test_reader_sees_consistent_frames() -> None:
+    name  = f"led-test-{os.getpid()}"
+    ctx   = multiprocessing.get_context("fork")
+    created, done = ctx.Event(), ctx.Event()
+    count = 200000
+    publisher = ctx.Process(target=_publish, args=(name, count, created, done))
+    publisher.start()
+    try:
+        assert created.wait(5.0)
+        reader = SharedFrameReader(name)
+        try:
+            reads = 0
+            sequence = 0
+            while sequence < 2 * count and publisher.is_alive():
+                result = reader.read()
+                if result is None:
+                    continue
+                sequence, _ = result
+                frame = reader.frame
+                assert frame == bytes([frame[0]]) * FRAME_SIZE
+                assert frame[0] == (sequence // 2) % 256
+                reads += 1
+        finally:
+            reader.close()
+            done.set()
+    finally:
+        publisher.join(10.0)
+
+    assert publisher.exitcode == 0
+    assert reads > 10
+
+
+def test_controller_publishes_shown_frames() -> None:
+    controller = LedController(num_led=2)
+    controller.shared_frame = SharedFrameBuffer(f"led-test-{os.getpid()}", len(controller.frame), 2)
+    reader = SharedFrameReader(controller.shared_frame.name)
+    try:
+        assert reader.read() is None
+        assert reader.num_led == 2
+
+        controller.fill(1, 2, 3)
+        controller.show()
+        controller.show()
+        sequence, _ = reader.read()
+        assert sequence == 2
+        assert reader.frame == bytes([1, 2, 3, 100] * 2)
+    finally:
+        reader.close()
+        controller.shared_frame.close()
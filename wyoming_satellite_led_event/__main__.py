@@ -1,64 +1,171 @@
 import argparse
 import logging
 import asyncio
-import time
-import importlib
+import re
+import signal
 import sys
 
 from functools import partial
-from wyoming.server import AsyncEventHandler, AsyncServer
-from wyoming.event import Event
-from .base import LedPatternRunner, AbstractLedPattern
+from typing import Optional
+from .base import LedPatternRunner, AbstractLedController, AbstractLedPattern, CompositeLedController, FlightRecorder, FrameRateGovernor, Profiler, DEFAULT_FPS
+from .base.flight_recorder import DEFAULT_SECONDS, default_path
+from .base.frame_rate_governor import DEFAULT_MIN_FPS
+from .base.led_pattern import parse_transition
+from . import registry
 
 _LOGGER   = logging.getLogger()
-_PCK_NAME = "wyoming_satellite_led_event"
 
-def create_led_pattern(name : str) -> AbstractLedPattern:
-    #name scheme LED Controller(Proxy)/pattern for generic patterns
-    #more to come?
+# the "/" before the pattern is followed by its name and optional options,
+# a "/" in an option value of the controller is not
+_LED_PATTERN = re.compile(r"(.*?)(?:/([A-Za-z_][\w-]*(?::.*)?))?", re.DOTALL)
 
-    p = name.split("/")
+def split_led_pattern(name : str):
+    """Splits controller/pattern into the controller and the pattern, both with their options"""
+    led_controller, led_pattern = _LED_PATTERN.fullmatch(name).groups()
+    return led_controller, led_pattern or "default"
 
-    try:
-        led_controller_lib = importlib.import_module(".led_controller." + p[0], _PCK_NAME)
-        led_controller_cls = getattr(led_controller_lib, "LedController", None)
-        if led_controller_cls is None:
+
+def parse_options(name : str):
+    """Splits name:key=value,key=value into the name and a dict of options"""
+    name, _, options = name.partition(":")
+    return name, dict(option.split("=", 1) for option in options.split(",") if option)
+
+
+def create_led_controller(name : str) -> AbstractLedController:
+    """Creates the controller of name:options, controllers joined with + are driven as one strip"""
+    controllers = []
+    for part in name.split("+"):
+        controller_name, controller_options = parse_options(part)
+
+        try:
+            led_controller_cls = registry.load(registry.LED_CONTROLLER, controller_name)
+        except LookupError:
+            _LOGGER.fatal("LED Controller not found")
+            sys.exit(1)
+        except AttributeError:
             _LOGGER.fatal("LED Controller implementation error")
             sys.exit(1)
+        except ImportError as e:
+            _LOGGER.fatal("LED Controller %s needs a missing module: %s", controller_name, e)
+            sys.exit(1)
+
+        try:
+            controllers.append(led_controller_cls(**controller_options))
+        except (TypeError, ValueError) as e:
+            _LOGGER.fatal("Invalid LED Controller options: %s", e)
+            sys.exit(1)
+        except ImportError as e:
+            _LOGGER.fatal("LED Controller %s needs a missing module: %s", controller_name, e)
+            sys.exit(1)
+        except OSError as e:
+            # e.g. a host which cannot be resolved or a missing device
+            _LOGGER.fatal("LED Controller %s could not be opened: %s", controller_name, e)
+            sys.exit(1)
+
+    if len(controllers) == 1:
+        return controllers[0]
+
+    return CompositeLedController(controllers)
 
-    except ModuleNotFoundError:
-        _LOGGER.fatal("LED Controller not found")
+
+def create_shared_frame(led_pattern : AbstractLedPattern, name : str):
+    """Publishes the frames of the controller of the pattern in the shared memory segment name"""
+    from .base.shared_frame import SharedFrameBuffer
+
+    led_controller = getattr(led_pattern, "led_controller", None)
+    frame = led_controller.frame if led_controller else None
+    if frame is None:
+        _LOGGER.fatal("LED Controller has no frame buffer to share")
+        sys.exit(1)
+
+    try:
+        led_controller.shared_frame = SharedFrameBuffer(name, len(frame), led_controller.num_led)
+    except FileExistsError:
+        _LOGGER.fatal("Shared memory %s exists already", name)
         sys.exit(1)
 
+    return led_controller.shared_frame
 
 
-    pattern_name = p[1] if len(p) > 1 else "default"
+def create_flight_recorder(led_pattern : AbstractLedPattern, path : Optional[str], capacity : float) -> Optional[FlightRecorder]:
+    """Recorder of the last capacity frames of the controller of the pattern, if a path is given and it has a frame buffer"""
+    led_controller = getattr(led_pattern, "led_controller", None)
+    frame = led_controller.frame if led_controller else None
+    if path is None or frame is None or capacity < 1:
+        return None
+
+    return FlightRecorder(len(frame), int(capacity), path)
+
+
+def write_profile(profiler : Profiler, cprofile, path : Optional[str]):
+    """Prints the report of --profile and writes --profile-output"""
+    if profiler.totals:
+        print(profiler.report(), flush=True)
+    if cprofile is not None:
+        cprofile.disable()
+        cprofile.dump_stats(path)
+    elif path:
+        profiler.write_collapsed(path)
+
+
+def create_led_pattern(name : str, led_controller : AbstractLedController = None) -> AbstractLedPattern:
+    """Creates the pattern of name, with led_controller instead of the one in name if given"""
+    #name scheme LED Controller(Proxy)/pattern for generic patterns
+    #both may have options, e.g. mock/baked:file=/tmp/alexa.bin
+    #several controllers joined with + form one strip, e.g. apa102+mock/alexa
+    #more to come?
+
+    controller_name, pattern_name = split_led_pattern(name)
+    pattern_name, pattern_options = parse_options(pattern_name)
     try:
-        led_pattern_lib = importlib.import_module(".led_pattern." +pattern_name, _PCK_NAME)
-        led_pattern_cls = getattr(led_pattern_lib, "LedPattern", None)
-        if led_pattern_cls is None:
-            _LOGGER.fatal("LED Pattern implementation error")
-            sys.exit(1)
-    except ModuleNotFoundError:
+        led_pattern_cls = registry.load(registry.LED_PATTERN, pattern_name)
+    except LookupError:
         _LOGGER.fatal("LED Pattern not found")
         sys.exit(1)
+    except AttributeError:
+        _LOGGER.fatal("LED Pattern implementation error")
+        sys.exit(1)
+    except ImportError as e:
+        _LOGGER.fatal("LED Pattern %s needs a missing module: %s", pattern_name, e)
+        sys.exit(1)
 
 
 
-    return led_pattern_cls(
-             led_controller=led_controller_cls()
-           )
+    if led_controller is None:
+        led_controller = create_led_controller(controller_name)
+    try:
+        return led_pattern_cls(
+                 led_controller=led_controller,
+                 **pattern_options
+               )
+    except (TypeError, ValueError) as e:
+        _LOGGER.fatal("Invalid LED Pattern options: %s", e)
+        sys.exit(1)
 
 
 
-async def main():
+def main():
     """Main entry point."""
     parser = argparse.ArgumentParser()
 
-    parser.add_argument("--led-pattern", required=True, help="LED Pattern to use in format led_controller/pattern or led_controller. Last uses the default model from wyoming-satellite", )
+    parser.add_argument("--list", action="store_true", help="List the available LED Controllers and Patterns")
+    parser.add_argument("--led-pattern", required=False, help="LED Pattern to use in format led_controller/pattern or led_controller. Last uses the default model from wyoming-satellite", )
 
     parser.add_argument("--uri", required=False, help="unix:// or tcp://")
     parser.add_argument("--test", action="store_true", help="Test supplied LED Pattern")
+    parser.add_argument("--fast", action="store_true", help="With --test, run the test with virtual time and print the state changes instead of showing the pattern")
+    parser.add_argument("--bake", metavar="FILE", help="Bake the states of the LED Pattern into FILE for the baked pattern")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="Maximum number of frames per second written to the LEDs")
+    parser.add_argument("--min-fps", type=float, default=DEFAULT_MIN_FPS, help="Lowest frame rate while the CPU is busy, e.g. with wake word detection. Set to --fps to disable")
+    parser.add_argument("--fps-load", action="store_true", help="Also lower the frame rate while the load average exceeds the number of CPUs")
+    parser.add_argument("--record", metavar="FILE", help="Append all received Wyoming events to FILE, see replay.py")
+    parser.add_argument("--metrics-uri", required=False, help="Serve metrics in Prometheus format on unix:// or tcp://, e.g. tcp://127.0.0.1:9700")
+    parser.add_argument("--shared-frame", metavar="NAME", help="Publish every shown frame in the shared memory segment NAME, read it with python -m wyoming_satellite_led_event.frame_reader NAME")
+    parser.add_argument("--flight-recorder", metavar="FILE", nargs="?", const=default_path(), help=f"Keep the last shown frames and dump them to FILE on SIGUSR1 or an error of the runner, default {default_path()}")
+    parser.add_argument("--flight-recorder-seconds", type=float, default=DEFAULT_SECONDS, help="Seconds of shown frames kept for --flight-recorder, limited to 16 MiB of frames")
+    parser.add_argument("--profile", action="store_true", help="Measure the time of the states and hooks spent in the pattern, set_led_color, show and the event queue, printed on exit or SIGUSR2")
+    parser.add_argument("--profile-output", metavar="FILE", help="With --profile, also write FILE: cProfile statistics if it ends with .pstats, otherwise collapsed stacks for flame graphs")
+    parser.add_argument("--transition", action="append", default=[], metavar="EVENT[@STATE]=[STATE[,DEBOUNCE[,HOOK[,MIN_DISPLAY]]]]", help="Add or override a state transition on a Wyoming event, e.g. detection=listening,0,wakeup,0.25. May be given multiple times")
 
     parser.add_argument("--debug", action="store_true", help="Log DEBUG messages")
     args = parser.parse_args()
@@ -68,58 +175,147 @@ async def main():
 
     args = parser.parse_args()
 
-    if not args.test and not args.uri:
-        _LOGGER.fatal("Either --test or --uri is required")
+    if args.list:
+        for kind, title in ((registry.LED_CONTROLLER, "LED Controller"), (registry.LED_PATTERN, "LED Pattern")):
+            print(f"{title}:")
+            for name, description in registry.available(kind).items():
+                print(f"  {name:<16} {description}")
+        return
+
+    if not args.led_pattern:
+        _LOGGER.fatal("--led-pattern is required")
+        sys.exit(1)
+
+    if not args.test and not args.bake and not args.uri:
+        _LOGGER.fatal("Either --test, --bake or --uri is required")
+        sys.exit(1)
+
+    try:
+        transitions = dict(parse_transition(spec) for spec in args.transition)
+    except (KeyError, ValueError) as e:
+        _LOGGER.fatal("Invalid transition: %s", e)
         sys.exit(1)
 
     led_pattern : AbstractLedPattern = create_led_pattern(args.led_pattern)
+
+    profiler = Profiler() if args.profile else None
+    cprofile = None
+    if profiler is not None and args.profile_output and args.profile_output.endswith(".pstats"):
+        import cProfile
+        cprofile = cProfile.Profile()
+        cprofile.enable()
+
+    # the report is printed however the modes end
+    try:
+        if args.test and args.fast:
+            fast_test(led_pattern, args.fps, transitions, profiler)
+        elif args.bake:
+            if profiler is not None:
+                _LOGGER.warning("--profile only writes cProfile statistics with --bake")
+            bake_led_pattern(led_pattern, args.led_pattern, args.bake, args.fps)
+        else:
+            asyncio.run(serve(args, led_pattern, transitions, profiler))
+    finally:
+        if profiler:
+            write_profile(profiler, cprofile, args.profile_output)
+
+
+def fast_test(led_pattern : AbstractLedPattern, fps : float, transitions : dict, profiler : Optional[Profiler]):
+    """Runs the test scenarios with virtual time and prints the state changes"""
+    from .test_pattern import fast_forward
+
     led_pattern.setup()
+    try:
+        states, frames = fast_forward(led_pattern, fps, transitions=transitions, profiler=profiler)
+    except ValueError as e:
+        _LOGGER.fatal("%s", e)
+        sys.exit(1)
 
-    if args.test:
-        from .test_pattern import test_pattern
-        await test_pattern(led_pattern)
-        return
+    for t, state in states:
+        print(f"{t:8.3f} {state.name}")
+    print(f"{len(frames)} frames")
 
 
-    _LOGGER.info("Ready")
-    # Start server
-    server = AsyncServer.from_uri(args.uri)
+def bake_led_pattern(led_pattern : AbstractLedPattern, name : str, path : str, fps : float):
+    """Bakes the states of a new pattern of name per state into path"""
+    from .bake import bake
 
+    led_pattern.setup()
     try:
-        await server.run(partial(EventHandler, led_pattern))
-    except KeyboardInterrupt:
-        pass
+        bake(partial(create_led_pattern, name), led_pattern.led_controller, path, fps)
     finally:
         led_pattern.cleanup()
 
 
-class EventHandler(AsyncEventHandler):
-    def __init__(
-        self,
-        led_pattern : AbstractLedPattern,
-        *args,
-        **kwargs,
-    ) -> None:
-        super().__init__(*args, **kwargs)
+async def serve(args, led_pattern : AbstractLedPattern, transitions : dict, profiler : Optional[Profiler]):
+    """Runs the test scenarios in real time with --test, otherwise the server on --uri"""
+    # one runner for all connections
+    try:
+        governor = FrameRateGovernor(args.fps, args.min_fps, load=args.fps_load) if args.min_fps < args.fps else None
+        flight_recorder = create_flight_recorder(led_pattern, args.flight_recorder, args.flight_recorder_seconds * args.fps)
+        runner = LedPatternRunner(led_pattern, args.fps, transitions, governor, flight_recorder=flight_recorder, profiler=profiler)
+    except ValueError as e:
+        _LOGGER.fatal("%s", e)
+        sys.exit(1)
+
+    led_pattern.setup()
+
+    shared_frame = None
+    if args.shared_frame:
+        shared_frame = create_shared_frame(led_pattern, args.shared_frame)
 
-        self.led_pattern : LedPatternRunner = LedPatternRunner(led_pattern)
-        self.led_pattern.setup()
-        self.client_id = str(time.monotonic_ns())
+    if runner.flight_recorder is not None:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, runner.flight_recorder.dump, "on SIGUSR1")
+
+    if profiler is not None:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, lambda: print(profiler.report(), flush=True))
+
+    if args.test:
+        from .test_pattern import test_pattern
+        try:
+            await test_pattern(led_pattern, args.fps, runner)
+        finally:
+            if shared_frame:
+                shared_frame.close()
+        return
 
-        _LOGGER.debug("Client connected: %s", self.client_id)
+    runner.setup()
 
-    async def handle_event(self, event: Event) -> bool:
-        _LOGGER.debug(event)
+    recorder = None
+    if args.record:
+        from .event_log import EventRecorder
+        recorder = EventRecorder(args.record)
 
-        if self.led_pattern:
-            await self.led_pattern.handle_event(event)
+    metrics_server = None
+    if args.metrics_uri:
+        from .base.metrics import serve_metrics
+        metrics_server = await serve_metrics(args.metrics_uri, runner.registry)
 
-        return True
+    # the server is only needed here, importing it slows down the other modes
+    from wyoming.server import AsyncServer
+    from .event_handler import EventHandler
+
+    _LOGGER.info("Ready")
+    # Start server
+    server = AsyncServer.from_uri(args.uri)
+
+    try:
+        await server.run(partial(EventHandler, runner, recorder))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.cleanup()
+        if metrics_server:
+            metrics_server.close()
+        if recorder:
+            recorder.close()
+        if shared_frame:
+            shared_frame.close()
 
 
 def run():
     try:
-        asyncio.run(main())
+        main()
     except KeyboardInterrupt:
         pass
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+# Bakes the states of a pattern into a file for the "baked" pattern
+
+import asyncio
+import logging
+
+from typing import Callable
+
+from .base import AbstractLedController, AbstractLedPattern, RecordingLedController, VirtualTimeEventLoop
+from .base.animation import FrameTable
+from .led_pattern.baked import write_frame_tables
+
+_LOGGER = logging.getLogger()
+
+# pattern coroutines in the order they are recorded
+STATES = (
+    "client_connected",
+    "idle",
+    "wakeup",
+    "listen",
+    "think",
+    "speak",
+    "error",
+    "client_disconnected",
+    "disconnected",
+)
+
+# states still running after this time are looping
+MAX_DURATION = 10.0
+
+
+async def record_state(pattern : AbstractLedPattern, recorder : RecordingLedController, name : str, max_duration : float = MAX_DURATION) -> FrameTable:
+    """Runs one pattern coroutine and returns the frames it has shown"""
+    loop = asyncio.get_running_loop()
+    recorder.frames.clear()
+
+    task = asyncio.create_task(getattr(pattern, name)())
+    done, _ = await asyncio.wait([task], timeout=max_duration)
+    end = loop.time()
+    if not done:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    # frames shown at the same time are replaced by the last one
+    times  = []
+    frames = []
+    for t, frame in recorder.frames:
+        if times and times[-1] == t:
+            frames[-1] = frame
+        else:
+            times.append(t)
+            frames.append(frame)
+
+    # the last frame is shown until the coroutine finished or was cut off
+    durations = [b - a for a, b in zip(times, times[1:])]
+    if frames:
+        durations.append(end - times[-1])
+
+    looping = not done
+    if looping:
+        period = _period(frames, durations)
+        frames, durations = frames[:period], durations[:period]
+
+    return FrameTable(frames, durations, looping)
+
+
+def _period(frames, durations) -> int:
+    """Number of frames after which the recorded frames repeat.
+
+    The last frame is left out, as it was cut off at the end of recording.
+    """
+    count = len(frames) - 1
+    for period in range(1, count // 2 + 1):
+        if all(
+            frames[i] == frames[i + period] and abs(durations[i] - durations[i + period]) < 1e-6
+            for i in range(count - period)
+        ):
+            return period
+
+    return len(frames)
+
+
+async def bake_pattern(create_pattern : Callable[[AbstractLedController], AbstractLedPattern], led_controller : AbstractLedController, frame_interval : float) -> dict:
+    """Records every state with a new pattern from create_pattern(led_controller),
+    so no state depends on the ones recorded before"""
+    recorder = RecordingLedController(led_controller, asyncio.get_running_loop().time)
+    black = recorder.snapshot()
+
+    tables = {}
+    for name in STATES:
+        pattern = create_pattern(recorder)
+        pattern.frame_interval = frame_interval
+        recorder.load_frame(black)
+        recorder.invalidate()
+        tables[name] = await record_state(pattern, recorder, name)
+        _LOGGER.debug("Baked %s: %s frames", name, len(tables[name].frames))
+
+    return tables
+
+
+def bake(create_pattern : Callable[[AbstractLedController], AbstractLedPattern], led_controller : AbstractLedController, path : str, fps : float):
+    """Records all states of the pattern created by create_pattern(led_controller)
+    with virtual time and writes them to path"""
+    loop = VirtualTimeEventLoop()
+    try:
+        tables = loop.run_until_complete(bake_pattern(create_pattern, led_controller, 1.0 / fps))
+    finally:
+        loop.close()
+
+    with open(path, "wb") as f:
+        write_frame_tables(f, tables, led_controller.num_led)
+
+    _LOGGER.info("Baked %s states into %s", len(tables), path)
@@ -1,2 +1,11 @@
 from .led_controller import AbstractLedController
-from .led_pattern import LedPatternRunner, AbstractLedPattern, GenericLedPattern
\ No newline at end of file
+from .frame_compositor import FrameCompositor, DEFAULT_FPS
+from .frame_rate_governor import FrameRateGovernor
+from .frame_writer import FrameWriter
+from .recording_led_controller import RecordingLedController
+from .composite_led_controller import CompositeLedController
+from .flight_recorder import FlightRecorder
+from .profiler import Profiler
+from .virtual_time import VirtualTimeEventLoop
+from .animation import Animation, Keyframe
+from .led_pattern import LedPatternRunner, AbstractLedPattern, GenericLedPattern
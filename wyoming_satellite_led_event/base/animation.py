@@ -0,0 +1,173 @@
+import asyncio
+
+from math import ceil
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .led_controller import AbstractLedController
+from .frame_compositor import DEFAULT_FPS
+
+
+# compiled animations by pattern class, name, frame format of the controller and frame interval
+_FRAME_TABLES : Dict[tuple, "FrameTable"] = {}
+
+
+class Keyframe(NamedTuple):
+    """Colors of all LEDs at a point in time of an animation.
+
+    colors is either one color for all LEDs or a sequence with one color
+    per LED. A color is (red, green, blue) or (red, green, blue, brightness),
+    brightness defaults to the one of the keyframe.
+    """
+    time       : float
+    colors     : Sequence
+    brightness : int = 100
+
+
+class FrameTable:
+    """Precomputed frames of an animation in the frame format of the controller"""
+
+    def __init__(self, frames : List[bytes], durations : List[float], loop : bool):
+        self.frames    = frames
+        self.durations = durations
+        self.loop      = loop
+
+
+    async def play(self, led_controller : AbstractLedController, frame_interval : Optional[Callable[[], float]] = None):
+        """Shows the frames one after another, scheduled at absolute times
+        so rounding of the durations does not add up.
+
+        frame_interval returns the current interval between two frames,
+        frames replaced before it has passed are skipped. A frame rate
+        lowered by the governor lowers the work of the animation, too.
+        """
+        if not self.frames:
+            return
+
+        if self.loop and len(self.frames) == 1:
+            # static, nothing to do after the first frame
+            led_controller.load_frame(self.frames[0])
+            led_controller.show()
+            return
+
+        loop = asyncio.get_running_loop()
+        frames, durations = self.frames, self.durations
+        count = len(frames)
+        # the last frame of a table without loop is always shown
+        last  = None if self.loop else count - 1
+
+        i = 0
+        deadline = loop.time()
+        while True:
+            led_controller.load_frame(frames[i])
+            led_controller.show()
+
+            shown = deadline
+            deadline += durations[i]
+            i += 1
+            if i == count:
+                if not self.loop:
+                    await asyncio.sleep(deadline - loop.time())
+                    break
+                i = 0
+
+            if frame_interval is not None:
+                due = shown + frame_interval()
+                skipped = 0
+                while i != last and skipped < count - 1 and deadline + durations[i] <= due:
+                    deadline += durations[i]
+                    i = (i + 1) % count
+                    skipped += 1
+
+            await asyncio.sleep(deadline - loop.time())
+
+
+class Animation:
+    """Declarative animation as a timeline of keyframes.
+
+    With interpolate the colors are faded linearly between two keyframes,
+    otherwise every keyframe is held until the next one. A looping animation
+    restarts at the time of the last keyframe, so its colors should match
+    the first one. Without loop the last keyframe stays visible.
+    """
+
+    def __init__(self, keyframes : Sequence[Keyframe], loop : bool = False, interpolate : bool = False):
+        self.keyframes   = sorted(keyframes, key=lambda k: k.time)
+        self.loop        = loop
+        self.interpolate = interpolate
+
+
+    def compile(self, led_controller : AbstractLedController, frame_interval : float = 0.0) -> FrameTable:
+        """Renders the animation into a frame table for the controller.
+
+        Interpolated animations are sampled once per frame interval. Equal
+        consecutive frames are merged, the controller's frame is restored.
+        """
+        frame_interval = frame_interval or 1.0 / DEFAULT_FPS
+        num_led = led_controller.num_led
+
+        steps : List[Tuple[float, List[Tuple[int, int, int, int]]]] = []
+        for keyframe, next_keyframe in zip(self.keyframes, self.keyframes[1:]):
+            colors = self.__colors(keyframe, num_led)
+            length = next_keyframe.time - keyframe.time
+            if not self.interpolate:
+                steps.append((length, colors))
+                continue
+
+            next_colors = self.__colors(next_keyframe, num_led)
+            count = max(1, ceil(length / frame_interval))
+            for n in range(count):
+                f = n / count
+                steps.append((length / count, [
+                    tuple(int(round(a + (b - a) * f)) for a, b in zip(color, next_color))
+                    for color, next_color in zip(colors, next_colors)
+                ]))
+
+        if not self.loop:
+            steps.append((0.0, self.__colors(self.keyframes[-1], num_led)))
+
+        previous_frame = led_controller.snapshot()
+        frames    : List[bytes] = []
+        durations : List[float] = []
+        try:
+            for duration, colors in steps:
+                for i, color in enumerate(colors):
+                    led_controller.set_led_color(i, *color)
+                frame = led_controller.snapshot()
+
+                if frames and frames[-1] == frame:
+                    durations[-1] += duration
+                else:
+                    frames.append(frame)
+                    durations.append(duration)
+        finally:
+            led_controller.load_frame(previous_frame)
+
+        if self.loop and len(frames) > 1 and frames[0] == frames[-1]:
+            durations[0] += durations.pop()
+            frames.pop()
+
+        return FrameTable(frames, durations, self.loop)
+
+
+    @staticmethod
+    def __colors(keyframe : Keyframe, num_led : int) -> List[Tuple[int, int, int, int]]:
+        colors = keyframe.colors
+        if isinstance(colors[0], int):
+            colors = [colors] * num_led
+
+        return [
+            tuple(color) if len(color) == 4 else (*color, keyframe.brightness)
+            for color in colors
+        ]
+
+
+def frame_table(key : tuple, build, led_controller : AbstractLedController, frame_interval : float) -> FrameTable:
+    """Returns the cached frame table for key, build(num_led) returns the
+    Animation to compile if there is none yet."""
+    key = (*key, led_controller.frame_format, frame_interval)
+    table = _FRAME_TABLES.get(key)
+    if table is None:
+        table = build(led_controller.num_led).compile(led_controller, frame_interval)
+        _FRAME_TABLES[key] = table
+
+    return table
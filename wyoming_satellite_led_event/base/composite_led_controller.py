@@ -0,0 +1,118 @@
+from typing import List
+
+from .led_controller import AbstractLedController
+from .frame_writer import FrameWriter
+
+
+class CompositeLedController(AbstractLedController):
+    """Drives several LED controllers as one strip.
+
+    The LEDs of the controllers are numbered one after another. Patterns
+    render directly into the frame buffers of the controllers, changed
+    frames are written by one FrameWriter thread per controller, so the
+    devices are written in parallel and a frame takes as long as the
+    slowest device. The controllers need a frame buffer, the FrameWriter
+    of a controller with one (writer) is used, the others need write().
+    """
+
+    def __init__(self, led_controllers : List[AbstractLedController]):
+        super().__init__()
+        self.led_controllers = list(led_controllers)
+        self.num_led = sum(c.num_led for c in self.led_controllers)
+
+        # first LED of every controller and (controller, LED) per LED
+        self.__offsets = []
+        self.__index   = []
+        for controller in self.led_controllers:
+            self.__offsets.append(len(self.__index))
+            self.__index.extend((controller, i) for i in range(controller.num_led))
+
+        # last frame written per controller, copied in place on every change
+        self.__sizes   = [len(c.frame) for c in self.led_controllers]
+        self.__written = [bytearray(size) for size in self.__sizes]
+        self.__valid   = [False] * len(self.led_controllers)
+
+        # the joined frames, show() compares them to skip unchanged frames
+        self.__frame = bytearray(sum(self.__sizes))
+        self.__parts = []
+        start = 0
+        for size in self.__sizes:
+            self.__parts.append(slice(start, start + size))
+            start += size
+
+        # writers started by the composite, the controllers stop their own
+        self.__own_writers = []
+        self.__writers     = []
+        for n, (controller, size) in enumerate(zip(self.led_controllers, self.__sizes)):
+            writer = getattr(controller, "writer", None)
+            if writer is None:
+                writer = FrameWriter(controller.write, size, name=f"led-frame-writer-{n}")
+                writer.start()
+                self.__own_writers.append(writer)
+            self.__writers.append(writer)
+
+
+    @property
+    def frame(self):
+        frame = self.__frame
+        for controller, part in zip(self.led_controllers, self.__parts):
+            frame[part] = controller.frame
+        return frame
+
+
+    @property
+    def frame_format(self) -> tuple:
+        return (type(self), tuple(c.frame_format for c in self.led_controllers))
+
+
+    def set_led_color(self, led_num, red, green, blue, bright_percent=100):
+        if 0 <= led_num < self.num_led:
+            controller, i = self.__index[led_num]
+            controller.set_led_color(i, red, green, blue, bright_percent)
+
+
+    def fill_range(self, start, end, red, green, blue, bright_percent=100):
+        for controller, offset in zip(self.led_controllers, self.__offsets):
+            first = max(start - offset, 0)
+            last  = min(end - offset, controller.num_led)
+            if first < last:
+                controller.fill_range(first, last, red, green, blue, bright_percent)
+
+
+    def set_colors(self, colors, bright_percent=100):
+        colors = memoryview(colors).cast("B")
+        for controller, offset in zip(self.led_controllers, self.__offsets):
+            part = colors[3 * offset : 3 * (offset + controller.num_led)]
+            if not part:
+                break
+            controller.set_colors(part, bright_percent)
+
+
+    def load_frame(self, frame):
+        frame = memoryview(frame).cast("B")
+        for controller, part in zip(self.led_controllers, self.__parts):
+            controller.load_frame(frame[part])
+
+
+    def invalidate(self):
+        super().invalidate()
+        self.__valid = [False] * len(self.led_controllers)
+
+
+    def write_frame(self):
+        # only controllers with a changed frame are written
+        for n, controller in enumerate(self.led_controllers):
+            frame = controller.frame
+            written = self.__written[n]
+            if not self.__valid[n] or written != frame:
+                self.__writers[n].post(frame)
+                written[:] = frame
+                self.__valid[n] = True
+
+
+    def cleanup(self):
+        for writer in self.__own_writers:
+            writer.stop()
+        for controller in self.led_controllers:
+            controller.cleanup()
+        super().cleanup()
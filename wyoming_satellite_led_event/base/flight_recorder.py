@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import tempfile
+import time
+
+from array import array
+from typing import Iterator, Optional, Tuple
+
+_LOGGER = logging.getLogger()
+
+# seconds of frames kept
+DEFAULT_SECONDS = 10.0
+
+# memory of the frames at most, e.g. 7 seconds of 10000 LEDs at 50 fps
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# file in the runtime directory of the user, if there is one
+DEFAULT_FILE = "wyoming_satellite_led_event_frames.jsonl"
+
+
+def default_path() -> str:
+    return os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), DEFAULT_FILE)
+
+
+class FlightRecorder:
+    """Keeps the last capacity frames shown by a controller in a ring buffer.
+
+    Frames, their time.monotonic() and the state of the runner are stored
+    in preallocated arrays, recording a frame allocates nothing. The
+    frames take max_bytes at most, capacity is lowered for large frames.
+    dump() writes them to path, one JSON object per line with t, state and
+    the frame as hex.
+    """
+
+    def __init__(self, frame_size : int, capacity : int, path : str, max_bytes : int = DEFAULT_MAX_BYTES):
+        self.frame_size = frame_size
+        self.capacity   = max(min(int(capacity), max_bytes // max(frame_size, 1)), 1)
+        self.path       = path
+
+        # value of the runner state, set by LedPatternRunner
+        self.state = 0
+
+        self.__frames = bytearray(frame_size * self.capacity)
+        view = memoryview(self.__frames)
+        self.__slots  = [view[i * frame_size : (i + 1) * frame_size] for i in range(self.capacity)]
+        self.__times  = array("d", bytes(8 * self.capacity))
+        self.__states = array("B", bytes(self.capacity))
+        self.__next   = 0
+        self.__full   = False
+
+
+    def __len__(self) -> int:
+        return self.capacity if self.__full else self.__next
+
+
+    def record(self, frame):
+        i = self.__next
+        self.__slots[i][:] = frame
+        self.__times[i]  = time.monotonic()
+        self.__states[i] = self.state
+        i += 1
+        if i == self.capacity:
+            i = 0
+            self.__full = True
+        self.__next = i
+
+
+    def frames(self) -> Iterator[Tuple[float, int, bytes]]:
+        """Yields (time, state, frame) from the oldest to the latest frame"""
+        start = self.__next if self.__full else 0
+        for n in range(len(self)):
+            i = (start + n) % self.capacity
+            yield self.__times[i], self.__states[i], bytes(self.__slots[i])
+
+
+    def dump(self, reason : str = "") -> Optional[str]:
+        """Writes the frames to path, returns it or None on an error.
+
+        The frames are written to a new file only the user can read, which
+        then replaces path, so a file or link planted at path is not
+        written through.
+        """
+        from .led_pattern import AbstractLedPattern
+
+        states = {state.value: state.name for state in AbstractLedPattern.STATE}
+        directory, name = os.path.split(os.path.abspath(self.path))
+        temp = None
+        try:
+            fd, temp = tempfile.mkstemp(prefix=f".{name}.", dir=directory)
+            with open(fd, "w", encoding="utf-8") as f:
+                for t, state, frame in self.frames():
+                    f.write(json.dumps({"t": round(t, 6), "state": states.get(state), "frame": frame.hex()}, separators=(",", ":")) + "\n")
+            os.replace(temp, self.path)
+        except OSError as e:
+            _LOGGER.error("Could not dump the frames to %s: %s", self.path, e)
+            if temp is not None and os.path.exists(temp):
+                os.unlink(temp)
+            return None
+
+        _LOGGER.info("Dumped %s frames to %s %s", len(self), self.path, reason)
+        return self.path
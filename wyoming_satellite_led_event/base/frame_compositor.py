@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from typing import Callable, Optional
+
+from .led_controller import AbstractLedController
+from .frame_rate_governor import FrameRateGovernor
+
+DEFAULT_FPS = 50
+
+
+class FrameCompositor:
+    """Pushes the frames of a pattern to the LED controller at a fixed maximum rate.
+
+    Patterns still call show(), but this only marks the frame buffer as
+    changed. The compositor writes at most one frame per tick, ticks are
+    scheduled at absolute deadlines, so the rate does not drift. Without
+    changes there are no ticks at all. With a governor the rate is lowered
+    while the event loop lags behind.
+    """
+
+    def __init__(self, led_controller : AbstractLedController, fps : float = DEFAULT_FPS, governor : Optional[FrameRateGovernor] = None):
+        self.__led_controller : AbstractLedController = led_controller
+        self.__frame_requested : asyncio.Event = None
+        self.__task            : asyncio.Task  = None
+        self.interval = 1.0 / fps
+        self.governor = governor
+
+        # called with the new interval when the governor changes it
+        self.interval_changed : Optional[Callable[[float], None]] = None
+
+        # called with the loop time and the duration of every flushed frame
+        self.flushed : Optional[Callable[[float, float], None]] = None
+
+
+    def setup(self):
+        self.__frame_requested = asyncio.Event()
+        if self.governor:
+            self.__requested_at = None
+            self.__led_controller.defer_show(self.__request_timed)
+        else:
+            self.__led_controller.defer_show(self.__frame_requested.set)
+        self.__task = asyncio.create_task(self.__run())
+
+
+    def cleanup(self):
+        if self.__task:
+            self.__task.cancel()
+            self.__task = None
+        self.__led_controller.flush()
+        self.__led_controller.defer_show(None)
+
+
+    def __request_timed(self):
+        # the governor measures the lag from the first request of a frame
+        if not self.__frame_requested.is_set():
+            self.__requested_at = asyncio.get_running_loop().time()
+            self.__frame_requested.set()
+
+
+    async def __run(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+
+        while True:
+            await self.__frame_requested.wait()
+
+            now = loop.time()
+            if now < deadline:
+                await self.__sleep_until(loop, deadline)
+            else:
+                # idle for more than one frame, don't catch up on missed ticks
+                deadline = now
+
+            if self.governor:
+                # how late the loop ran the compositor, after the request or tick
+                self.__govern(loop.time(), max(deadline, self.__requested_at))
+
+            self.__frame_requested.clear()
+            if self.flushed is None:
+                self.__led_controller.flush()
+            else:
+                start = time.perf_counter()
+                if self.__led_controller.flush():
+                    self.flushed(loop.time(), time.perf_counter() - start)
+            deadline += self.interval
+
+
+    def __govern(self, now, due):
+        interval = self.governor.update(now, now - due)
+        if interval != self.interval:
+            self.interval = interval
+            if self.interval_changed:
+                self.interval_changed(interval)
+
+
+    @staticmethod
+    async def __sleep_until(loop, deadline):
+        future = loop.create_future()
+        handle = loop.call_at(deadline, future.set_result, None)
+        try:
+            await future
+        finally:
+            handle.cancel()
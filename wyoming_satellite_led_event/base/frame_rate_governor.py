@@ -0,0 +1,80 @@
+import logging
+import os
+
+_LOGGER = logging.getLogger()
+
+# frame rate floor of the command line
+DEFAULT_MIN_FPS = 10
+
+# lag of the event loop considered as CPU contention
+MAX_LAG = 0.010
+
+# time without lag before the frame rate is raised again
+RECOVERY_TIME = 2.0
+
+# interval of reading the system load
+LOAD_INTERVAL = 1.0
+
+
+class FrameRateGovernor:
+    """Adapts the frame rate of a compositor to the load of the system.
+
+    The lag is how late the compositor woke up for a frame, so measuring
+    it needs no extra timer. If it exceeds max_lag, or with load the load
+    average per CPU exceeds 1, the frame rate is halved down to min_fps.
+    After recovery_time without lag it is doubled again up to max_fps.
+    """
+
+    def __init__(self, max_fps : float, min_fps : float = DEFAULT_MIN_FPS, max_lag : float = MAX_LAG, load : bool = False, recovery_time : float = RECOVERY_TIME):
+        self.max_fps = max_fps
+        self.min_fps = min(min_fps, max_fps)
+        self.max_lag = max_lag
+        self.load    = load
+        self.recovery_time = recovery_time
+
+        self.fps = max_fps
+        self.lag = 0.0
+        self.throttled = 0
+        self.restored  = 0
+
+        self.__calm_since = None
+        self.__load_read  = None
+        self.__overloaded = False
+
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.fps
+
+
+    def update(self, now : float, lag : float) -> float:
+        """Takes the lag of a frame at loop time now, returns the frame interval"""
+        self.lag = lag
+        busy = lag > self.max_lag or self.__system_overloaded(now)
+
+        if busy:
+            self.__calm_since = None
+            if self.fps > self.min_fps:
+                self.fps = max(self.min_fps, self.fps / 2)
+                self.throttled += 1
+                _LOGGER.debug("Frame rate lowered to %.1f fps, lag %.1f ms", self.fps, lag * 1000)
+        elif self.__calm_since is None:
+            self.__calm_since = now
+        elif self.fps < self.max_fps and now - self.__calm_since >= self.recovery_time:
+            self.__calm_since = now
+            self.fps = min(self.max_fps, self.fps * 2)
+            self.restored += 1
+            _LOGGER.debug("Frame rate raised to %.1f fps", self.fps)
+
+        return self.interval
+
+
+    def __system_overloaded(self, now : float) -> bool:
+        if not self.load:
+            return False
+
+        if self.__load_read is None or now - self.__load_read >= LOAD_INTERVAL:
+            self.__load_read  = now
+            self.__overloaded = os.getloadavg()[0] > (os.cpu_count() or 1)
+
+        return self.__overloaded
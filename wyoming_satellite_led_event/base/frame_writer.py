@@ -0,0 +1,70 @@
+import logging
+import threading
+
+_LOGGER = logging.getLogger()
+
+
+class FrameWriter:
+    """Writes frames from a dedicated thread, so blocking transfers (e.g. SPI)
+    don't run on the event loop.
+
+    post() hands a frame over through a single slot mailbox. A frame which
+    has not been written yet is replaced by a newer one, so slow transfers
+    never queue up. The frames are copied into two preallocated buffers.
+    """
+
+    def __init__(self, write, frame_size : int, name : str = "led-frame-writer"):
+        self.__write     = write
+        self.__pending   = bytearray(frame_size)
+        self.__sending   = bytearray(frame_size)
+        self.__condition = threading.Condition()
+        self.__thread    = threading.Thread(target=self.__run, name=name, daemon=True)
+
+        self.__has_pending = False
+        self.__running     = False
+
+        self.frames_posted     = 0
+        self.frames_written    = 0
+        self.frames_superseded = 0
+
+
+    def start(self):
+        self.__running = True
+        self.__thread.start()
+
+
+    def stop(self, timeout : float = 1.0):
+        """Stops the thread after the pending frame has been written"""
+        with self.__condition:
+            self.__running = False
+            self.__condition.notify()
+        self.__thread.join(timeout)
+
+
+    def post(self, frame):
+        with self.__condition:
+            self.__pending[:] = frame
+            if self.__has_pending:
+                self.frames_superseded += 1
+            self.__has_pending = True
+            self.frames_posted += 1
+            self.__condition.notify()
+
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while self.__running and not self.__has_pending:
+                    self.__condition.wait()
+
+                if not self.__has_pending:
+                    return
+
+                self.__pending, self.__sending = self.__sending, self.__pending
+                self.__has_pending = False
+
+            try:
+                self.__write(self.__sending)
+                self.frames_written += 1
+            except Exception as e:
+                _LOGGER.exception(e)
@@ -4,13 +4,129 @@ class AbstractLedController:
     def __init__(self) -> None:
         self.num_led = None
 
+        # statistics of show(), frames equal to the last one are not written
+        self.frames_shown   = 0
+        self.frames_skipped = 0
+        self.__shown_frame  = None
+
+        # set by a compositor, show() then only requests a frame
+        self.__show_requested = None
+        self.__frame_pending  = False
+
+        # SharedFrameBuffer publishing and FlightRecorder keeping every written frame, optional
+        self.shared_frame    = None
+        self.flight_recorder = None
+
     def cleanup(self):
         pass
 
+    @property
+    def frame(self):
+        """Pixel buffer of the controller (bytearray or array('B')) or None.
+
+        Used by show() to detect unchanged frames and by snapshot() and
+        load_frame() to copy whole frames.
+        """
+        return None
+
+    @property
+    def frame_format(self) -> tuple:
+        """Controllers with equal frame_format have interchangeable frames"""
+        return (type(self), self.num_led)
+
+    def invalidate(self):
+        """Forces the next show() to write the frame"""
+        self.__shown_frame = None
+
     @abc.abstractmethod
     def set_led_color(self, led_num, red, green, blue, bright_percent=100):
         pass
 
-    @abc.abstractmethod
+    # Bulk operations. The defaults fall back to set_led_color(), controllers
+    # with a pixel buffer override them with slice operations on the buffer.
+
+    def fill(self, red, green, blue, bright_percent=100):
+        """Sets all LEDs to one color"""
+        self.fill_range(0, self.num_led, red, green, blue, bright_percent)
+
+    def fill_range(self, start, end, red, green, blue, bright_percent=100):
+        """Sets the LEDs start to end (exclusive) to one color"""
+        for i in range(max(start, 0), min(end, self.num_led)):
+            self.set_led_color(i, red, green, blue, bright_percent)
+
+    def set_colors(self, colors, bright_percent=100):
+        """Sets the LEDs from a buffer with red, green and blue byte per LED.
+
+        colors can be any object supporting the buffer protocol, e.g. bytes,
+        array('B') or a NumPy uint8 array.
+        """
+        colors = memoryview(colors).cast("B")
+        for i in range(min(len(colors) // 3, self.num_led)):
+            self.set_led_color(i, colors[3 * i], colors[3 * i + 1], colors[3 * i + 2], bright_percent)
+
+    def snapshot(self) -> bytes:
+        """Copy of the current frame, which can be restored with load_frame()"""
+        return bytes(self.frame)
+
+    def load_frame(self, frame):
+        """Restores a frame taken with snapshot() of the same controller"""
+        memoryview(self.frame)[:] = frame
+
+    def defer_show(self, show_requested):
+        """Defers show() until flush() is called.
+
+        show_requested is called on every show(), None restores the
+        immediate write.
+        """
+        self.__show_requested = show_requested
+        self.__frame_pending  = False
+
     def show(self):
-        pass
\ No newline at end of file
+        if self.__show_requested is not None:
+            self.__frame_pending = True
+            self.__show_requested()
+            return
+
+        self.__show()
+
+    def flush(self) -> bool:
+        """Writes a frame requested by a deferred show(), returns if there was one"""
+        if self.__frame_pending:
+            self.__frame_pending = False
+            self.__show()
+            return True
+
+        return False
+
+    def __show(self):
+        frame = self.frame
+        if frame is not None and frame == self.__shown_frame:
+            self.frames_skipped += 1
+            return
+
+        self.write_frame()
+        self.frames_shown += 1
+        if self.shared_frame is not None:
+            self.shared_frame.publish(frame)
+        if self.flight_recorder is not None:
+            self.flight_recorder.record(frame)
+
+        if frame is not None:
+            if self.__shown_frame is None:
+                self.__shown_frame = frame[:]
+            else:
+                self.__shown_frame[:] = frame
+
+    @abc.abstractmethod
+    def write_frame(self):
+        """Writes the current frame to the LEDs"""
+        pass
+
+    @abc.abstractmethod
+    def write(self, frame):
+        """Writes a frame in the format of frame to the LEDs.
+
+        Unlike write_frame() it may be called from another thread, it is
+        needed to use the controller in a CompositeLedController.
+        """
+        pass
@@ -1,34 +1,25 @@
 import asyncio
 import logging
+import time
 
 from enum import Enum
-
-from wyoming.event import Event
-from wyoming.asr import Transcript
-from wyoming.audio import AudioStart, AudioStop
-from wyoming.error import Error
-from wyoming.snd import Played
-from wyoming.tts import Synthesize
-from wyoming.vad import VoiceStarted, VoiceStopped
-from wyoming.wake import Detection
-from wyoming.satellite import SatelliteConnected, SatelliteDisconnected, StreamingStarted, StreamingStopped
+from typing import Callable, NamedTuple, Optional, TYPE_CHECKING
 
 from .led_controller import AbstractLedController
+from .frame_compositor import FrameCompositor, DEFAULT_FPS
+from .frame_rate_governor import FrameRateGovernor
+from .animation import frame_table
+from .flight_recorder import FlightRecorder
+from .profiler import Profiler, EVENTS, PATTERN
+from .metrics import Counter, Gauge, Histogram, Registry, LATENCY_BUCKETS, DURATION_BUCKETS
 
-_LOGGER = logging.getLogger()
+if TYPE_CHECKING:
+    from wyoming.event import Event
 
-class _EVENTS(Enum):
-    CONNECTED    = 200
-    DISCONNECTED = 201
-    WAKEUP       = 202
-    LISTEN_START = 203
-    LISTEN_END   = 204
-    THINK_START  = 205
-    THINK_END    = 206
-    SPEAK_START  = 207
-    SPEAK_END    = 208
-    ERROR        = 209
+_LOGGER = logging.getLogger()
 
+# unchanged frames after which the runner stops the state coroutine
+PARK_AFTER_FRAMES = 25
 
 class AbstractLedPattern:
     class STATE(Enum):
@@ -38,6 +29,25 @@ class AbstractLedPattern:
         THINKING     = 103
         SPEAKING     = 104
 
+    # time between two frames pushed by the runner, set by LedPatternRunner
+    frame_interval = 0.0
+
+    # frame interval at the full frame rate, animations are compiled for it
+    # and skip frames while the governor raises frame_interval
+    animation_interval = 0.0
+
+    # A state coroutine which has reached its final picture should return,
+    # the picture stays on the LEDs without any timer or write until the next
+    # state. Coroutines which keep showing an unchanged picture are stopped
+    # by the runner after PARK_AFTER_FRAMES.
+
+    # transitions of the pattern, extend or override DEFAULT_TRANSITIONS
+    transitions = {}
+
+    async def sleep(self, delay : float) -> None:
+        """Sleeps between two animation steps, but at least one frame interval"""
+        await asyncio.sleep(max(delay, self.frame_interval))
+
     async def idle(self) -> None:
         pass
 
@@ -77,30 +87,194 @@ class GenericLedPattern(AbstractLedPattern):
         super().__init__(*agrs, **kwargs)
         self.led_controller = led_controller
 
+    async def animate(self, name : str, build) -> None:
+        """Plays an animation from its precomputed frames.
+
+        build(num_led) returns the Animation, it is only called and compiled
+        once per pattern class, name, LED controller and frame interval.
+        """
+        table = frame_table((type(self), name), build, self.led_controller, self.animation_interval or self.frame_interval)
+        await table.play(self.led_controller, lambda: self.frame_interval)
+
     def cleanup(self):
         self.led_controller.cleanup()
         return super().cleanup()
 
 
+class Transition(NamedTuple):
+    """Reaction of LedPatternRunner to a Wyoming event"""
+    state       : AbstractLedPattern.STATE  # next state
+    debounce    : float = 0.0               # time to wait for further events before the state starts
+    hook        : Optional[str] = None      # one-shot pattern coroutine, run before the state coroutine
+    min_display : float = 0.0               # time the hook is shown before a later state may replace it
+
+
+_STATE = AbstractLedPattern.STATE
+
+#    Jan 23 18:05:04 Event(type='run-pipeline', data={'start_stage': 'asr', 'end_stage': 'tts', 'restart_on_end': False}, payload=None)
+#    Jan 23 18:05:04 Event(type='detection', data={'name': 'jarvis', 'timestamp': 142290504007}, payload=None)
+#    Jan 23 18:05:04 Event(type='streaming-started', data=None, payload=None)
+#    Jan 23 18:05:04 Event(type='transcribe', data={'language': 'de'}, payload=None)
+#    Jan 23 18:05:07 Event(type='voice-started', data={'timestamp': 1135}, payload=None)
+#    Jan 23 18:05:08 Event(type='voice-stopped', data={'timestamp': 1615}, payload=None)
+#    Jan 23 18:05:13 Event(type='transcript', data={'text': 'Vergiss es.'}, payload=None)
+#    Jan 23 18:05:13 Event(type='streaming-stopped', data=None, payload=None)
+
+# (Wyoming event type, current state or None for any state) -> Transition
+# events without transition don't change the state
+DEFAULT_TRANSITIONS = {
+    ("satellite-connected",    None)        : Transition(_STATE.IDLE,         0.250, "client_connected"),
+    ("satellite-disconnected", None)        : Transition(_STATE.DISCONNECTED, 0,     "client_disconnected"),
+    ("detection",              None)        : Transition(_STATE.LISTENING,    0,     "wakeup", 0.250),
+    ("voice-started",          _STATE.IDLE) : Transition(_STATE.LISTENING,    0),
+    ("streaming-started",      _STATE.IDLE) : Transition(_STATE.LISTENING,    0),
+    ("voice-stopped",          None)        : Transition(_STATE.THINKING,     0.250),
+    ("transcript",             None)        : Transition(_STATE.IDLE,         0.250),
+    ("audio-start",            None)        : Transition(_STATE.SPEAKING,     0.250),
+    ("played",                 None)        : Transition(_STATE.IDLE,         0.250),
+    ("error",                  None)        : Transition(_STATE.IDLE,         0,     "error",  0.500),
+}
+
+# pattern coroutine per state
+STATE_COROUTINES = {
+    _STATE.DISCONNECTED : "disconnected",
+    _STATE.IDLE         : "idle",
+    _STATE.LISTENING    : "listen",
+    _STATE.THINKING     : "think",
+    _STATE.SPEAKING     : "speak",
+}
+
+
+def compile_transitions(*tables) -> dict:
+    """Merges transition tables into one keyed by (event type, state).
+
+    Later tables override earlier ones, a transition None removes one.
+    Entries for any state are expanded to all states, so a lookup is a
+    single dict access.
+    """
+    compiled = {}
+    for table in tables:
+        # entries for any state first, so state specific ones of the same table win
+        for (event_type, state), transition in sorted((table or {}).items(), key=lambda i: i[0][1] is not None):
+            for s in (_STATE if state is None else (state,)):
+                if transition is None:
+                    compiled.pop((event_type, s), None)
+                else:
+                    compiled[(event_type, s)] = transition
+
+    return compiled
+
+
+def parse_transition(spec : str):
+    """Parses EVENT[@STATE]=NEXT_STATE[,DEBOUNCE[,HOOK[,MIN_DISPLAY]]] into a transition table entry.
+
+    Without NEXT_STATE (EVENT[@STATE]=) the event is ignored.
+    """
+    key, _, value = spec.partition("=")
+    event_type, _, state = key.partition("@")
+    state = _STATE[state.upper()] if state else None
+    if not value:
+        return (event_type, state), None
+
+    next_state, debounce, hook, min_display = (value.split(",") + ["", "", ""])[:4]
+    return (event_type, state), Transition(_STATE[next_state.upper()], float(debounce or 0), hook or None, float(min_display or 0))
+
+
 class LedPatternRunner():
-    def __init__(self, pattern: AbstractLedPattern):
+    """Drives a pattern by Wyoming events.
+
+    One runner is shared by all client connections of the process, the
+    connections are registered with connect() and disconnect().
+    """
+
+    def __init__(self, pattern: AbstractLedPattern, fps : float = DEFAULT_FPS, transitions : dict = None, governor : FrameRateGovernor = None, park_after : int = PARK_AFTER_FRAMES, flight_recorder : FlightRecorder = None, profiler : Profiler = None):
         self.__event_queue    : asyncio.Queue = None
         self.__evt_queue_task : asyncio.Task  = None
         self.__pattern_task   : asyncio.Task  = None
+        self.__compositor     : FrameCompositor = None
 
         self.__pattern        : AbstractLedPattern = pattern
         self.__state = AbstractLedPattern.STATE.DISCONNECTED
+        self.__clients        : set = set()
+
+        # event type and arrival time of the last transition, until its first frame
+        self.__latency_pending : tuple = None
+        self.__fps_start  = None
+        self.__fps_frames = 0
+
+        # loop time until which the running one-shot effect must stay visible
+        self.__hook_until = 0.0
+
+        # unchanged frames in a row of the running state, not counted while
+        # its hook runs, a hook may hold a picture as long as it needs
+        self.__park_after     = park_after
+        self.__unchanged      = 0
+        self.__frames_written = 0
+        self.__in_state       = False
+
+        # called with every new state, before its pattern coroutine starts
+        self.state_changed : Optional[Callable[[AbstractLedPattern.STATE], None]] = None
+
+        self.registry = Registry()
+        self.__latency = self.registry.register(Histogram("led_event_latency_seconds", "Time from a Wyoming event to the first frame of the resulting state", LATENCY_BUCKETS))
+        self.__event_wait = self.registry.register(Histogram("led_event_wait_seconds", "Time a Wyoming event waits in the queue of the runner", LATENCY_BUCKETS))
+        self.__event_processing = self.registry.register(Histogram("led_event_processing_seconds", "Time the runner spends on a Wyoming event after taking it from the queue, including the start of the resulting state", DURATION_BUCKETS))
+        self.__show_duration = self.registry.register(Histogram("led_show_duration_seconds", "Time to write a frame", DURATION_BUCKETS))
+        self.__frames = self.registry.register(Counter("led_frames_total", "Frames written"))
+        self.__parked = self.registry.register(Counter("led_states_parked_total", "State coroutines stopped after showing an unchanged picture"))
+        self.__fps = self.registry.register(Gauge("led_frame_rate", "Frames written per second"))
+        self.registry.register(Gauge("led_event_queue_depth", "Events waiting for the runner", lambda: self.__event_queue.qsize() if self.__event_queue else 0))
+        self.registry.register(Gauge("led_connections", "Connected clients", lambda: len(self.__clients)))
+        self.registry.register(Gauge("led_tasks", "Running asyncio tasks", lambda: len(asyncio.all_tasks())))
+
+        self.__transitions = compile_transitions(DEFAULT_TRANSITIONS, pattern.transitions, transitions)
+        for transition in self.__transitions.values():
+            if transition.hook and not callable(getattr(pattern, transition.hook, None)):
+                raise ValueError(f"Pattern has no hook {transition.hook}")
+
+        led_controller = getattr(pattern, "led_controller", None)
+        self.__led_controller : AbstractLedController = led_controller
+
+        # measures the time of the states and hooks, see Profiler
+        self.profiler = profiler
+        if profiler is not None and led_controller is not None:
+            profiler.instrument(led_controller)
+
+        # keeps the shown frames with the state, dumped on an exception
+        self.flight_recorder = flight_recorder
+        if flight_recorder is not None:
+            flight_recorder.state = self.__state.value
+            if led_controller is not None:
+                led_controller.flight_recorder = flight_recorder
+        if led_controller is not None:
+            self.__compositor = FrameCompositor(led_controller, fps, governor)
+            self.__compositor.flushed = self.__flushed
+            self.__compositor.interval_changed = self.__interval_changed
+            self.__pattern.frame_interval = self.__pattern.animation_interval = self.__compositor.interval
+
+        if governor:
+            self.registry.register(Gauge("led_loop_lag_seconds", "Lag of the event loop at the last frame", lambda: governor.lag))
+            self.registry.register(Gauge("led_target_frame_rate", "Frame rate set by the governor", lambda: governor.fps))
+            self.registry.register(Counter("led_frame_rate_lowered_total", "Times the governor lowered the frame rate", lambda: governor.throttled))
+            self.registry.register(Counter("led_frame_rate_raised_total", "Times the governor raised the frame rate", lambda: governor.restored))
 
 
     def setup(self):
         self.__event_queue    = asyncio.Queue()
-        self.__evt_queue_task = asyncio.create_task(self.__event_queue_runner())
+        event_queue_runner    = self.__event_queue_runner()
+        if self.profiler is not None:
+            event_queue_runner = self.profiler.timed(event_queue_runner, EVENTS)
+        self.__evt_queue_task = asyncio.create_task(event_queue_runner)
+        if self.__compositor:
+            self.__compositor.setup()
 
 
     def cleanup(self):
         if self.__pattern_task:
             self.__pattern_task.cancel()
         self.__evt_queue_task.cancel()
+        if self.__compositor:
+            self.__compositor.cleanup()
         self.__pattern.cleanup()
 
 
@@ -109,72 +283,129 @@ class LedPatternRunner():
         return self.__state
 
 
+    @property
+    def metrics(self) -> dict:
+        return {
+            "connections" : len(self.__clients),
+            "tasks"       : len(asyncio.all_tasks()),
+        }
 
-    async def __start_pattern_state(self, c):
-        async def __run(c):
-            await c()
 
+    def connect(self, client_id : str):
+        self.__clients.add(client_id)
+        _LOGGER.debug("Client connected: %s %s", client_id, self.metrics)
 
-        if self.__pattern_task:
-            self.__pattern_task.cancel()
-            try:
-                await self.__pattern_task
-            except asyncio.CancelledError:
-                pass
 
-        self.__pattern_task = asyncio.create_task(__run(c))
+    async def disconnect(self, client_id : str):
+        self.__clients.discard(client_id)
 
+        # connection lost without satellite-disconnected
+        if not self.__clients and self.__state != AbstractLedPattern.STATE.DISCONNECTED:
+            from wyoming.event import Event
+            await self.handle_event(Event("satellite-disconnected"))
 
+        _LOGGER.debug("Client disconnected: %s %s", client_id, self.metrics)
 
-    def translate_event(event : Event, assumed_current_state):
-#    Jan 23 18:05:04 Event(type='run-pipeline', data={'start_stage': 'asr', 'end_stage': 'tts', 'restart_on_end': False}, payload=None)
-#    Jan 23 18:05:04 Event(type='detection', data={'name': 'jarvis', 'timestamp': 142290504007}, payload=None)
-#    Jan 23 18:05:04 Event(type='streaming-started', data=None, payload=None)
-#    Jan 23 18:05:04 Event(type='transcribe', data={'language': 'de'}, payload=None)
-#    Jan 23 18:05:07 Event(type='voice-started', data={'timestamp': 1135}, payload=None)
-#    Jan 23 18:05:08 Event(type='voice-stopped', data={'timestamp': 1615}, payload=None)
-#    Jan 23 18:05:13 Event(type='transcript', data={'text': 'Vergiss es.'}, payload=None)
-#    Jan 23 18:05:13 Event(type='streaming-stopped', data=None, payload=None)
 
-        if SatelliteConnected.is_type(event.type):
-            return _EVENTS.CONNECTED
 
-        elif SatelliteDisconnected.is_type(event.type):
-            return _EVENTS.DISCONNECTED
+    def __interval_changed(self, interval : float):
+        # patterns pick it up with their next sleep() or animation
+        self.__pattern.frame_interval = interval
+
+
+
+    def __flushed(self, now : float, duration : float):
+        self.__frames.inc()
+        self.__show_duration.observe(duration)
+
+        if self.__latency_pending:
+            label, received = self.__latency_pending
+            self.__latency.observe(now - received, transition=label)
+            self.__latency_pending = None
+
+        if self.__fps_start is None or now - self.__fps_start > 1.0:
+            if self.__fps_start is not None:
+                self.__fps.set(self.__fps_frames / (now - self.__fps_start))
+            self.__fps_start  = now
+            self.__fps_frames = 0
+        self.__fps_frames += 1
+
+        # the controller skips writing unchanged frames
+        frames_written = self.__led_controller.frames_shown
+        if frames_written == self.__frames_written:
+            if self.__in_state:
+                self.__unchanged += 1
+                if self.__unchanged == self.__park_after:
+                    self.__park()
+        else:
+            self.__frames_written = frames_written
+            self.__unchanged = 0
+
 
-        elif Detection.is_type(event.type):
-            return _EVENTS.WAKEUP
 
-        elif VoiceStarted.is_type(event.type) or StreamingStarted.is_type(event.type):
-            if assumed_current_state == AbstractLedPattern.STATE.IDLE:
-                return _EVENTS.LISTEN_START
+    def __park(self):
+        """Stops a state coroutine which only shows its final picture"""
+        if self.__pattern_task and not self.__pattern_task.done():
+            _LOGGER.debug("Parking %s after %s unchanged frames", self.__state.name, self.__unchanged)
+            self.__pattern_task.cancel()
+            self.__parked.inc()
+
+
+
+    async def __start_pattern_state(self, transition : Transition):
+        """Replaces the running state by the hook and the coroutine of the transition's state.
+
+        Both run in one task, so one-shot effects don't hold up the event
+        queue and are preempted by the next state.
+        """
+        profiler = self.profiler
+
+        async def __run(hook, state):
+            if hook:
+                if profiler is None:
+                    await hook()
+                else:
+                    await profiler.timed(hook(), PATTERN, transition.hook)
+                self.__unchanged = 0
+                self.__in_state  = True
+
+            if profiler is None:
+                await state()
+            else:
+                await profiler.timed(state(), PATTERN, transition.state.name)
+
 
-        elif VoiceStopped.is_type(event.type):
-            return _EVENTS.THINK_START
+        if self.__pattern_task:
+            self.__pattern_task.cancel()
+            try:
+                await self.__pattern_task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                # a failed state must not keep the next one from starting
+                _LOGGER.exception(e)
 
-        elif Transcript.is_type(event.type):
-            return _EVENTS.THINK_END
+        self.__unchanged = 0
 
-        elif AudioStart.is_type(event.type):
-            return _EVENTS.SPEAK_START
+        hook = getattr(self.__pattern, transition.hook) if transition.hook else None
+        self.__in_state = hook is None
+        if hook and transition.min_display:
+            self.__hook_until = asyncio.get_running_loop().time() + transition.min_display
 
-        elif Played.is_type(event.type):
-            return _EVENTS.SPEAK_END
+        self.__pattern_task = asyncio.create_task(__run(hook, getattr(self.__pattern, STATE_COROUTINES[transition.state])))
 
-        elif StreamingStopped.is_type(event.type):
-            if assumed_current_state != AbstractLedPattern.STATE.IDLE:
-                return
 
-        elif Error.is_type(event.type):
-            return _EVENTS.ERROR
 
-        return None
+    def transition(self, event_type : str, state) -> Optional[Transition]:
+        return self.__transitions.get((event_type, state))
 
 
 
     async def __event_queue_runner(self):
-        wyoming_event : Event
+        wyoming_event : "Event"
+        received      : float
         timeout = None
+        loop = asyncio.get_running_loop()
 
         def __timeout(new):
             if timeout is None:
@@ -186,74 +417,67 @@ class LedPatternRunner():
             try:
                 timeout = None
                 next_state = self.__state
-                pattern_event = None
+                transition = None
+                trigger    = None
+                # (type, seconds spent on it) of the collected events
+                processed  = []
 
+                # collect events until the debounce time of the transitions has passed
                 while True:
-                    process_event = False
-
                     try:
                         async with asyncio.timeout(timeout):
-                            wyoming_event = await self.__event_queue.get()
+                            wyoming_event, received = await self.__event_queue.get()
                     except TimeoutError:
-                        process_event = True
-
-                    pattern_event = LedPatternRunner.translate_event(wyoming_event, next_state) or pattern_event
-                    if pattern_event in ( _EVENTS.CONNECTED, _EVENTS.LISTEN_END, _EVENTS.THINK_END, _EVENTS.SPEAK_END ):
-                        next_state = AbstractLedPattern.STATE.IDLE
-                        timeout = __timeout(0.250)
-
-                    elif pattern_event == _EVENTS.ERROR:
-                        next_state = AbstractLedPattern.STATE.IDLE
-                        timeout = __timeout(0)
-
-                    elif pattern_event == _EVENTS.DISCONNECTED:
-                        next_state = AbstractLedPattern.STATE.DISCONNECTED
-                        timeout = __timeout(0)
-
-                    elif pattern_event in ( _EVENTS.WAKEUP, _EVENTS.LISTEN_START ):
-                        next_state = AbstractLedPattern.STATE.LISTENING
-                        timeout = __timeout(0)
-
-                    elif pattern_event == _EVENTS.THINK_START:
-                        next_state = AbstractLedPattern.STATE.THINKING
-                        timeout = __timeout(0.250)
-
-                    elif pattern_event == _EVENTS.SPEAK_START:
-                        next_state = AbstractLedPattern.STATE.SPEAKING
-                        timeout = __timeout(0.250)
-
-                    if process_event:
-                        break
-
-
-                if pattern_event == _EVENTS.CONNECTED:
-                    await self.__pattern.client_connected()
-                elif pattern_event == _EVENTS.DISCONNECTED:
-                    await self.__pattern.client_disconnected()
-                elif pattern_event == _EVENTS.WAKEUP:
-                    await self.__pattern.wakeup()
-                elif pattern_event == _EVENTS.ERROR:
-                    await self.__pattern.error()
+                        # keep collecting until a one-shot effect has been visible long enough
+                        remaining = self.__hook_until - loop.time()
+                        if remaining <= 0:
+                            break
+                        timeout = remaining
+                        continue
+
+                    self.__event_wait.observe(loop.time() - received, type=wyoming_event.type)
+                    dequeued = time.perf_counter()
+
+                    # events without transition keep the one of the previous event
+                    event_transition = self.__transitions.get((wyoming_event.type, next_state))
+                    if event_transition:
+                        transition = event_transition
+                        trigger    = (wyoming_event.type, received)
+                    if transition:
+                        next_state = transition.state
+                        timeout = __timeout(transition.debounce)
+                    processed.append((wyoming_event.type, time.perf_counter() - dequeued))
+
+
+                event_type, received = trigger
+                self.__latency_pending = (f"{event_type}->{next_state.name.lower()}", received)
 
                 self.__state = next_state
-
-                if self.__state == AbstractLedPattern.STATE.DISCONNECTED:
-                    await self.__start_pattern_state(self.__pattern.disconnected)
-                elif self.__state == AbstractLedPattern.STATE.IDLE:
-                    await self.__start_pattern_state(self.__pattern.idle)
-                elif self.__state == AbstractLedPattern.STATE.LISTENING:
-                    await self.__start_pattern_state(self.__pattern.listen)
-                elif self.__state == AbstractLedPattern.STATE.THINKING:
-                    await self.__start_pattern_state(self.__pattern.think)
-                elif self.__state == AbstractLedPattern.STATE.SPEAKING:
-                    await self.__start_pattern_state(self.__pattern.speak)
+                if self.flight_recorder is not None:
+                    self.flight_recorder.state = next_state.value
+                if self.profiler is not None:
+                    self.profiler.state = next_state.name
+                if self.state_changed:
+                    self.state_changed(next_state)
+                started = time.perf_counter()
+                await self.__start_pattern_state(transition)
+
+                # the debounce time is waiting, not processing
+                started = time.perf_counter() - started
+                for event_type, seconds in processed:
+                    self.__event_processing.observe(seconds + started, type=event_type)
 
             except Exception as e:
                 _LOGGER.exception(e)
+                if self.flight_recorder is not None:
+                    self.flight_recorder.dump(f"after {type(e).__name__}")
 
 
-    async def handle_event(self, event : Event):
-        await self.__event_queue.put(event)
+    async def handle_event(self, event : "Event", received : float = None):
+        """Queues an event, received is its arrival in loop time"""
+        if received is None:
+            received = asyncio.get_running_loop().time()
+        await self.__event_queue.put((event, received))
 
 
     # async def __runner(self):
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+_LOGGER = logging.getLogger()
+
+# seconds, event to first frame of the state
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# seconds, writing one frame
+DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025)
+
+# seconds a client may take to send its request
+REQUEST_TIMEOUT = 5.0
+
+
+class Metric:
+    """Metric in the Prometheus text format with optional labels.
+
+    With function the value is read from it on every render.
+    """
+    type = "untyped"
+
+    def __init__(self, name : str, help : str, function : Optional[Callable[[], float]] = None):
+        self.name = name
+        self.help = help
+        self.function = function
+        self._values : Dict[Tuple, object] = {}
+
+    @staticmethod
+    def _labels(labels : dict) -> Tuple:
+        return tuple(sorted(labels.items()))
+
+    @staticmethod
+    def _format(labels : Tuple, extra : Tuple = ()) -> str:
+        labels = labels + extra
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+    def samples(self):
+        if self.function is not None:
+            yield self.name, (), self.function()
+        for labels, value in self._values.items():
+            yield self.name, labels, value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{self._format(labels)} {value}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, value : float = 1, **labels):
+        key = self._labels(labels)
+        self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value : float, **labels):
+        self._values[self._labels(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name : str, help : str, buckets : Sequence[float]):
+        super().__init__(name, help)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value : float, **labels):
+        key = self._labels(labels)
+        data = self._values.get(key)
+        if data is None:
+            # counts per bucket plus +Inf, sum
+            data = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        data[0][bisect_left(self.buckets, value)] += 1
+        data[1] += value
+
+    def count(self, **labels) -> int:
+        data = self._values.get(self._labels(labels))
+        return sum(data[0]) if data else 0
+
+    def sum(self, **labels) -> float:
+        data = self._values.get(self._labels(labels))
+        return data[1] if data else 0.0
+
+    def labels(self):
+        """Labels of the observed values as dicts"""
+        return [dict(labels) for labels in self._values]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._format(labels, (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format(labels)} {total}")
+            lines.append(f"{self.name}_count{self._format(labels)} {cumulative}")
+        return "\n".join(lines)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics : Dict[str, Metric] = {}
+
+    def register(self, metric : Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+async def serve_metrics(uri : str, registry : Registry, timeout : float = REQUEST_TIMEOUT) -> asyncio.AbstractServer:
+    """Serves the registry in the Prometheus text format over HTTP on tcp://host:port or unix://path.
+
+    A client not sending its request within timeout seconds is disconnected.
+    """
+
+    async def handle(reader : asyncio.StreamReader, writer : asyncio.StreamWriter):
+        try:
+            # the request is not evaluated, every path returns the metrics
+            async with asyncio.timeout(timeout):
+                while (await reader.readline()).strip():
+                    pass
+
+            body = registry.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        except (ConnectionError, TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    from urllib.parse import urlparse
+
+    result = urlparse(uri)
+    if result.scheme == "unix":
+        return await asyncio.start_unix_server(handle, path=result.path)
+    if result.scheme == "tcp":
+        return await asyncio.start_server(handle, host=result.hostname, port=result.port)
+
+    raise ValueError("Only 'unix' and 'tcp' are supported")
@@ -0,0 +1,130 @@
+import time
+
+from typing import Dict, List, Tuple
+
+# categories the time is attributed to
+PATTERN = "pattern"
+SET_LED_COLOR = "set_led_color"
+SHOW = "show"
+EVENTS = "events"
+
+# controller methods and their category, set_led_color includes the bulk operations
+_CONTROLLER_METHODS = {
+    "set_led_color" : SET_LED_COLOR,
+    "fill_range"    : SET_LED_COLOR,
+    "set_colors"    : SET_LED_COLOR,
+    "load_frame"    : SET_LED_COLOR,
+    "show"          : SHOW,
+    "flush"         : SHOW,
+}
+
+
+class Profiler:
+    """Attributes wall and CPU time of the event loop thread to states and categories.
+
+    The key is the state or one-shot hook running, the categories are the
+    pattern code, set_led_color() and show() of the controller and the event
+    queue of the runner. Times are exclusive: set_led_color() called by the
+    pattern is not counted for the pattern. Nothing is measured unless a
+    LedPatternRunner is given a profiler.
+    """
+
+    def __init__(self):
+        # key of time measured outside of a timed coroutine, set by the runner
+        self.state = "DISCONNECTED"
+
+        # (key, category) -> [wall, cpu, calls]
+        self.totals : Dict[Tuple[str, str], List] = {}
+
+        # [key, category, wall start, cpu start, wall of children, cpu of children]
+        self.__stack = []
+
+
+    def enter(self, category : str, key : str = None):
+        if key is None:
+            key = self.__stack[-1][0] if self.__stack else self.state
+        self.__stack.append([key, category, time.perf_counter(), time.thread_time(), 0.0, 0.0])
+
+
+    def exit(self):
+        key, category, wall, cpu, child_wall, child_cpu = self.__stack.pop()
+        wall = time.perf_counter() - wall
+        cpu  = time.thread_time() - cpu
+
+        total = self.totals.get((key, category))
+        if total is None:
+            total = self.totals[(key, category)] = [0.0, 0.0, 0]
+        total[0] += wall - child_wall
+        total[1] += cpu - child_cpu
+        total[2] += 1
+
+        if self.__stack:
+            parent = self.__stack[-1]
+            parent[4] += wall
+            parent[5] += cpu
+
+
+    def instrument(self, led_controller):
+        """Measures the calls of the controller methods, by wrapping them on the instance"""
+
+        def timed(method, category):
+            def wrapper(*args, **kwargs):
+                self.enter(category)
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    self.exit()
+            return wrapper
+
+        for name, category in _CONTROLLER_METHODS.items():
+            setattr(led_controller, name, timed(getattr(led_controller, name), category))
+
+
+    async def timed(self, coro, category : str, key : str = None):
+        """Awaits coro and measures every step of it"""
+        return await _TimedCoroutine(self, coro, category, key)
+
+
+    def report(self) -> str:
+        lines = [f"{'state / hook':<16} {'category':<14} {'wall ms':>10} {'cpu ms':>10} {'calls':>8}"]
+        for (key, category), (wall, cpu, calls) in sorted(self.totals.items(), key=lambda item: -item[1][0]):
+            lines.append(f"{key:<16} {category:<14} {wall * 1000:10.3f} {cpu * 1000:10.3f} {calls:>8}")
+        return "\n".join(lines)
+
+
+    def write_collapsed(self, path : str):
+        """Writes the wall time in microseconds as collapsed stacks for flame graph tools"""
+        with open(path, "w", encoding="utf-8") as f:
+            for (key, category), (wall, _, _) in sorted(self.totals.items()):
+                f.write(f"{key};{category} {round(wall * 1e6)}\n")
+
+
+class _TimedCoroutine:
+    """Drives a coroutine like await does, measuring every send() and throw()"""
+
+    def __init__(self, profiler : Profiler, coro, category : str, key : str):
+        self.profiler = profiler
+        self.coro     = coro
+        self.category = category
+        self.key      = key
+
+    def __await__(self):
+        profiler = self.profiler
+        coro     = self.coro
+        value, error = None, None
+        while True:
+            profiler.enter(self.category, self.key)
+            try:
+                if error is None:
+                    future = coro.send(value)
+                else:
+                    future = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                profiler.exit()
+
+            try:
+                value, error = (yield future), None
+            except BaseException as e:
+                value, error = None, e
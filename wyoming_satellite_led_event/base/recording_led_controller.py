@@ -0,0 +1,75 @@
+import time
+
+from .led_controller import AbstractLedController
+
+
+class RecordingLedController(AbstractLedController):
+    """Wraps an LED controller and records the shown frames instead of writing them.
+
+    frames is a list of (time, frame) with frames in the format of the
+    wrapped controller. Unchanged frames are skipped as usual. Without
+    record only the calls and the LEDs set by them (pixel_writes) are
+    counted.
+    """
+
+    def __init__(self, led_controller : AbstractLedController, clock=time.monotonic, record : bool = True):
+        super().__init__()
+        self.led_controller = led_controller
+        self.num_led = led_controller.num_led
+        self.clock   = clock
+        self.record  = record
+        self.frames  = []
+
+        self.set_led_color_calls = 0
+        self.show_calls          = 0
+        self.pixel_writes        = 0
+
+
+    @property
+    def frame(self):
+        return self.led_controller.frame
+
+
+    @property
+    def frame_format(self) -> tuple:
+        return self.led_controller.frame_format
+
+
+    def set_led_color(self, led_num, red, green, blue, bright_percent=100):
+        self.set_led_color_calls += 1
+        self.pixel_writes += 1
+        self.led_controller.set_led_color(led_num, red, green, blue, bright_percent)
+
+
+    def fill_range(self, start, end, red, green, blue, bright_percent=100):
+        self.pixel_writes += max(min(end, self.num_led) - max(start, 0), 0)
+        self.led_controller.fill_range(start, end, red, green, blue, bright_percent)
+
+
+    def set_colors(self, colors, bright_percent=100):
+        self.pixel_writes += min(memoryview(colors).nbytes // 3, self.num_led)
+        self.led_controller.set_colors(colors, bright_percent)
+
+
+    def snapshot(self) -> bytes:
+        return self.led_controller.snapshot()
+
+
+    def load_frame(self, frame):
+        self.pixel_writes += self.num_led
+        self.led_controller.load_frame(frame)
+
+
+    def show(self):
+        self.show_calls += 1
+        super().show()
+
+
+    def write_frame(self):
+        if self.record:
+            self.frames.append((self.clock(), self.led_controller.snapshot()))
+
+
+    def cleanup(self):
+        self.led_controller.cleanup()
+        super().cleanup()
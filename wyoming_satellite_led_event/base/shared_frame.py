@@ -0,0 +1,107 @@
+import struct
+import time
+
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+# sequence, time.time() of the frame, frame size, number of LEDs
+_HEADER   = struct.Struct("<QdII")
+_SEQUENCE = struct.Struct("<Q")
+_TIME     = struct.Struct("<d")
+
+HEADER_SIZE = _HEADER.size
+
+# retries of a reader before it gives up on a frame
+READ_RETRIES = 1000
+
+
+class SharedFrameBuffer:
+    """Publishes the shown frames of a controller in a shared memory segment.
+
+    The segment holds a header and the last frame in the format of the
+    controller's frame. The sequence is a seqlock: it is odd while a frame
+    is written, so readers in other processes need no lock and retry if it
+    changed while they copied the frame. Publishing copies the frame once.
+    """
+
+    def __init__(self, name : str, frame_size : int, num_led : int):
+        self.__shm   = shared_memory.SharedMemory(name, create=True, size=HEADER_SIZE + frame_size)
+        self.__buf   = self.__shm.buf
+        self.__frame = self.__buf[HEADER_SIZE : HEADER_SIZE + frame_size]
+        _HEADER.pack_into(self.__buf, 0, 0, 0.0, frame_size, num_led)
+        self.sequence = 0
+
+
+    @property
+    def name(self) -> str:
+        return self.__shm.name
+
+
+    def publish(self, frame):
+        _SEQUENCE.pack_into(self.__buf, 0, self.sequence + 1)
+        self.__frame[:] = frame
+        _TIME.pack_into(self.__buf, _SEQUENCE.size, time.time())
+        self.sequence += 2
+        _SEQUENCE.pack_into(self.__buf, 0, self.sequence)
+
+
+    def close(self):
+        self.__frame.release()
+        self.__buf = None
+        self.__shm.close()
+        self.__shm.unlink()
+
+
+class SharedFrameReader:
+    """Reads the frames published by a SharedFrameBuffer of another process"""
+
+    def __init__(self, name : str):
+        try:
+            self.__shm = shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            # Python < 3.13 registers every attached segment to be removed
+            # when this process exits, even if another one created it
+            from multiprocessing import resource_tracker
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                self.__shm = shared_memory.SharedMemory(name)
+            finally:
+                resource_tracker.register = register
+
+        self.__buf = self.__shm.buf
+        _, _, self.frame_size, self.num_led = _HEADER.unpack_from(self.__buf)
+        self.__frame = self.__buf[HEADER_SIZE : HEADER_SIZE + self.frame_size]
+
+        # the last frame read, reused for every read
+        self.frame = bytearray(self.frame_size)
+
+
+    @property
+    def sequence(self) -> int:
+        return _SEQUENCE.unpack_from(self.__buf)[0]
+
+
+    def read(self) -> Optional[Tuple[int, float]]:
+        """Copies the current frame into frame, returns its (sequence, time).
+
+        Returns None if no frame was published yet or the writer kept
+        changing it.
+        """
+        buf = self.__buf
+        for _ in range(READ_RETRIES):
+            sequence = _SEQUENCE.unpack_from(buf)[0]
+            if sequence & 1:
+                continue
+            self.frame[:] = self.__frame
+            timestamp = _TIME.unpack_from(buf, _SEQUENCE.size)[0]
+            if _SEQUENCE.unpack_from(buf)[0] == sequence:
+                return (sequence, timestamp) if sequence else None
+
+        return None
+
+
+    def close(self):
+        self.__frame.release()
+        self.__buf = None
+        self.__shm.close()
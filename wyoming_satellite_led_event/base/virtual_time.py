@@ -0,0 +1,34 @@
+import asyncio
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """Event loop with a virtual clock.
+
+    Whenever there is nothing ready to run, the clock jumps to the next
+    scheduled timer instead of waiting for it. asyncio.sleep(), call_at()
+    and timeouts behave as usual, but take no wall clock time. Only meant
+    for code without real I/O, e.g. recording or testing pattern.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__time = 0.0
+
+
+    def time(self) -> float:
+        return self.__time
+
+
+    def advance(self, delay : float):
+        """Moves the clock forward as if the loop was blocked for delay seconds"""
+        self.__time += delay
+
+
+    def _run_once(self):
+        # _ready and _scheduled are internals of asyncio.BaseEventLoop, the
+        # heap may start with cancelled timers, which are not waited for
+        if not self._ready and self._scheduled:
+            pending = [handle.when() for handle in self._scheduled if not handle.cancelled()]
+            if pending:
+                self.__time = max(self.__time, min(pending))
+        super()._run_once()
@@ -0,0 +1,40 @@
+import asyncio
+import logging
+import time
+
+from wyoming.server import AsyncEventHandler
+from wyoming.event import Event
+from .base import LedPatternRunner
+
+_LOGGER = logging.getLogger()
+
+
+class EventHandler(AsyncEventHandler):
+    def __init__(
+        self,
+        runner : LedPatternRunner,
+        recorder,
+        *args,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+
+        self.led_pattern : LedPatternRunner = runner
+        self.recorder = recorder
+        self.client_id = str(time.monotonic_ns())
+        self.led_pattern.connect(self.client_id)
+
+    async def handle_event(self, event: Event) -> bool:
+        _LOGGER.debug(event)
+        received = asyncio.get_running_loop().time()
+
+        if self.recorder:
+            self.recorder.record(time.monotonic(), event)
+
+        if self.led_pattern:
+            await self.led_pattern.handle_event(event, received)
+
+        return True
+
+    async def disconnect(self) -> None:
+        await self.led_pattern.disconnect(self.client_id)
@@ -0,0 +1,35 @@
+# Log of Wyoming events, written by --record and read by the replay tool
+#
+# One JSON object per line: t (monotonic time in seconds), type, data and
+# payload (size of the payload in bytes, the payload itself is not logged)
+
+import json
+
+from typing import Iterator, Tuple
+
+from wyoming.event import Event
+
+
+class EventRecorder:
+    def __init__(self, path : str):
+        self.__file = open(path, "a", buffering=1, encoding="utf-8")
+
+
+    def record(self, t : float, event : Event):
+        self.__file.write(json.dumps(
+            {"t": round(t, 6), "type": event.type, "data": event.data or None, "payload": len(event.payload or b"")},
+            separators=(",", ":"),
+        ) + "\n")
+
+
+    def close(self):
+        self.__file.close()
+
+
+def read_events(path : str) -> Iterator[Tuple[float, Event]]:
+    """Yields (time, event) of a log written by EventRecorder"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                yield entry["t"], Event(entry["type"], entry.get("data") or {})
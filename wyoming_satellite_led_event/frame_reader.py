@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+# Prints the frames published with --shared-frame by a running service
+#
+#   python -m wyoming_satellite_led_event.frame_reader leds
+#
+# Every new frame is printed as sequence, age and the bytes of each LED in
+# the format of the controller. --interval samples at most every N seconds.
+
+import argparse
+import time
+
+from .base.shared_frame import SharedFrameReader
+
+
+def format_frame(reader : SharedFrameReader) -> str:
+    size = reader.frame_size // reader.num_led if reader.num_led else reader.frame_size
+    frame = reader.frame
+    return " ".join(frame[i : i + size].hex() for i in range(0, len(frame), size))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("name", help="Name given to --shared-frame")
+    parser.add_argument("--interval", type=float, default=0.02, help="Seconds between two samples")
+    parser.add_argument("--once", action="store_true", help="Print the current frame and exit")
+    args = parser.parse_args()
+
+    reader = SharedFrameReader(args.name)
+    last = None
+    try:
+        while True:
+            result = reader.read()
+            if result is not None and result[0] != last:
+                last, timestamp = result
+                print(f"{last // 2:>8} {1000 * (time.time() - timestamp):8.1f} ms  {format_frame(reader)}", flush=True)
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
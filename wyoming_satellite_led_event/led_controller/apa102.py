@@ -1,5 +1,6 @@
 from math import ceil
-import spidev
+
+from ..base import AbstractLedController, FrameWriter
 
 RGB_MAP = {
     "rgb": [3, 2, 1],
@@ -19,6 +20,8 @@ class APA102:
     # Constants
     MAX_BRIGHTNESS = 0b11111  # Safeguard: Set to a value appropriate for your setup
     LED_START = 0b11100000  # Three "1" bits, followed by 5 brightness bits
+    SPI_BUFFER_SIZE = 4096  # Default size of the spidev kernel buffer
+    SPI_BUFFER_SIZE_PARAMETER = "/sys/module/spidev/parameters/bufsiz"
 
     def __init__(
         self,
@@ -28,6 +31,8 @@ class APA102:
         bus=0,
         device=1,
         max_speed_hz=8000000,
+        gamma=1.0,
+        spi=None,
     ):
         self.num_led = num_led  # The number of LEDs in the Strip
         order = order.lower()
@@ -38,13 +43,52 @@ class APA102:
         else:
             self.global_brightness = global_brightness
 
-        self.leds = [self.LED_START, 0, 0, 0] * self.num_led  # Pixel buffer
-        self.spi = spidev.SpiDev()  # Init the SPI device
-        self.spi.open(bus, device)  # Open SPI port 0, slave device (CS) 1
+        # Lookup tables per brightness percentage with LED start frame and
+        # color tables per channel, built on first use (see __color_lut)
+        if isinstance(gamma, (int, float)):
+            gamma = (gamma, gamma, gamma)
+        self.gamma = tuple(gamma)
+        self.__gamma_curves = [
+            [255 * ((value / 255.0) ** g) for value in range(256)] for g in self.gamma
+        ]
+        self.__color_luts = [None] * 101
+
+        # Start frame, pixel buffer and end frame share one contiguous buffer,
+        # so a frame can be sent as is without copying or slicing it
+        # The end frame needs num_led / 2 clock edges, see clock_end_frame()
+        end = 4 + 4 * self.num_led
+        self.frame = bytearray(end + self.end_frame_size(self.num_led))
+        self.frame[4:end:4] = bytes([self.LED_START]) * self.num_led
+        self.frame[end:] = b"\xFF" * (len(self.frame) - end)
+        self.leds = memoryview(self.frame)[4:end]  # Pixel buffer
+
+        if spi is None:
+            import spidev
+
+            spi = spidev.SpiDev()  # Init the SPI device
+            spi.open(bus, device)  # Open SPI port 0, slave device (CS) 1
+        self.spi = spi
         # Up the speed a bit, so that the LEDs are painted faster
         if max_speed_hz:
             self.spi.max_speed_hz = max_speed_hz
 
+        if hasattr(self.spi, "writebytes2"):
+            # spidev >= 3.5 accepts any buffer and splits it into transfers
+            # of the kernel buffer size (4096 bytes by default) itself
+            self.__write = self.spi.writebytes2
+        else:
+            self.__chunk_size = self.spi_buffer_size()
+            self.__write = self.__write_chunked
+
+    @classmethod
+    def spi_buffer_size(cls):
+        """Size of the spidev kernel buffer, the maximum of one transfer"""
+        try:
+            with open(cls.SPI_BUFFER_SIZE_PARAMETER) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return cls.SPI_BUFFER_SIZE
+
     def clock_start_frame(self):
         """Sends a start frame to the LED strip.
 
@@ -81,11 +125,12 @@ class APA102:
         been sent as part of "clockEndFrame".
         """
 
-        self.spi.xfer2([0xFF] * 4)
+        self.spi.xfer2([0xFF] * self.end_frame_size(self.num_led))
 
-        # Round up num_led/2 bits (or num_led/16 bytes)
-        # for _ in range((self.num_led + 15) // 16):
-        #    self.spi.xfer2([0x00])
+    @staticmethod
+    def end_frame_size(num_led):
+        """Bytes of the end frame: num_led/2 bits rounded up, at least 4 bytes"""
+        return max(4, (num_led + 15) // 16)
 
     def set_pixel(self, led_num, red, green, blue, bright_percent=100):
         """Sets the color of one pixel in the LED stripe.
@@ -99,19 +144,92 @@ class APA102:
         if led_num >= self.num_led:
             return  # again, invisible
 
+        ledstart, red_lut, green_lut, blue_lut = self.__luts(bright_percent)
+
+        start_index = 4 * led_num
+        leds = self.leds
+        rgb = self.rgb
+        leds[start_index] = ledstart
+        leds[start_index + rgb[0]] = red_lut[red]
+        leds[start_index + rgb[1]] = green_lut[green]
+        leds[start_index + rgb[2]] = blue_lut[blue]
+
+    def set_pixel_range(self, start, end, red, green, blue, bright_percent=100):
+        """Sets the color of the pixels start to end (exclusive).
+
+        Like set_pixel(), but the pixel is computed once and copied
+        into the pixel buffer.
+        """
+        start = max(start, 0)
+        end = min(end, self.num_led)
+        if start >= end:
+            return
+
+        ledstart, red_lut, green_lut, blue_lut = self.__luts(bright_percent)
+
+        pixel = bytearray(4)
+        pixel[0] = ledstart
+        pixel[self.rgb[0]] = red_lut[red]
+        pixel[self.rgb[1]] = green_lut[green]
+        pixel[self.rgb[2]] = blue_lut[blue]
+        self.leds[4 * start : 4 * end] = pixel * (end - start)
+
+    def set_pixels(self, colors, bright_percent=100):
+        """Sets the color of the pixels from a buffer with red, green
+        and blue byte per pixel, starting at the first pixel.
+        """
+        colors = memoryview(colors).cast("B")
+        count = min(len(colors) // 3, self.num_led)
+        end = 4 * count
+        ledstart, *luts = self.__luts(bright_percent)
+
+        self.leds[0:end:4] = bytes([ledstart]) * count
+        for channel in range(3):
+            channel_colors = colors[channel : 3 * count : 3].tobytes()
+            self.leds[self.rgb[channel] : end : 4] = channel_colors.translate(luts[channel])
+
+    def __ledstart(self, bright_percent):
         # Calculate pixel brightness as a percentage of the
         # defined global_brightness. Round up to nearest integer
         # as we expect some brightness unless set to 0
         brightness = int(ceil(bright_percent * self.global_brightness / 100.0))
 
         # LED startframe is three "1" bits, followed by 5 brightness bits
-        ledstart = (brightness & 0b00011111) | self.LED_START
+        return (brightness & 0b00011111) | self.LED_START
 
-        start_index = 4 * led_num
-        self.leds[start_index] = ledstart
-        self.leds[start_index + self.rgb[0]] = red
-        self.leds[start_index + self.rgb[1]] = green
-        self.leds[start_index + self.rgb[2]] = blue
+    def __luts(self, bright_percent):
+        """Returns LED start frame and color tables for red, green and blue"""
+        if not 0 <= bright_percent <= 100:
+            # negative values would index the cache from the end
+            return self.__color_lut(bright_percent)
+
+        try:
+            luts = self.__color_luts[bright_percent]
+        except TypeError:
+            # not an integer
+            return self.__color_lut(bright_percent)
+
+        if luts is None:
+            luts = self.__color_lut(bright_percent)
+            self.__color_luts[bright_percent] = luts
+        return luts
+
+    def __color_lut(self, bright_percent):
+        """Builds the tables for one brightness percentage.
+
+        The 5 brightness bits only allow 31 steps, so the rest of the
+        brightness, which got lost by rounding up, is applied to the colors.
+        This avoids visible steps in fades with low brightness. The colors
+        are gamma corrected per channel as well.
+        """
+        ledstart = self.__ledstart(bright_percent)
+        brightness = ledstart & 0b00011111
+        scale = bright_percent * self.global_brightness / 100.0 / brightness if brightness else 0.0
+
+        luts = [ledstart]
+        for curve in self.__gamma_curves:
+            luts.append(bytes(min(255, int(round(value * scale))) for value in curve))
+        return tuple(luts)
 
     def set_pixel_rgb(self, led_num, rgb_color, bright_percent=100):
         """Sets the color of one pixel in the LED stripe.
@@ -137,23 +255,90 @@ class APA102:
         which means rotating in the opposite direction.
         """
         cutoff = 4 * (positions % self.num_led)
-        self.leds = self.leds[cutoff:] + self.leds[:cutoff]
+        self.leds[:] = bytes(self.leds[cutoff:]) + bytes(self.leds[:cutoff])
 
     def show(self):
         """Sends the content of the pixel buffer to the strip.
 
-        Todo: More than 1024 LEDs requires more than one xfer operation.
+        Start frame, pixels and end frame are sent with one write from the
+        preallocated frame buffer, nothing is allocated per frame.
         """
-        self.clock_start_frame()
+        self.write(self.frame)
+
+    def write(self, data):
+        """Sends a complete frame (start frame, pixels, end frame) from any
+        buffer with the layout of the frame buffer"""
+        self.__write(data)
+
+    def __write_chunked(self, data):
+        # Fallback for spidev < 3.5 without writebytes2.
         # xfer2 kills the list, unfortunately. So it must be copied first
-        # SPI takes up to 4096 Integers. So we are fine for up to 1024 LEDs.
-        data = list(self.leds)
-        while data:
-            self.spi.xfer2(data[:32])
-            data = data[32:]
-        self.clock_end_frame()
+        data = memoryview(data)
+        for i in range(0, len(data), self.__chunk_size):
+            self.spi.xfer2(list(data[i : i + self.__chunk_size]))
 
     def cleanup(self):
         """Release the SPI device; Call this method at the end"""
 
-        self.spi.close()  # Close SPI port
\ No newline at end of file
+        self.spi.close()  # Close SPI port
+
+
+class Apa102LedController(AbstractLedController):
+    """LED controller for APA102 LEDs.
+
+    Frames are written by a FrameWriter thread, the event loop only copies
+    the frame buffer into its mailbox.
+    """
+
+    def __init__(self, num_led, order="rgb", gamma=1.0, spi=None, **kwargs):
+        super().__init__()
+        # options from the command line are strings
+        self.num_led = int(num_led)
+        kwargs = {name: int(value) for name, value in kwargs.items()}
+        if isinstance(gamma, str):
+            gamma = [float(g) for g in gamma.split(":")]
+            gamma = gamma[0] if len(gamma) == 1 else gamma
+        self.__apa102 = APA102(num_led=self.num_led, order=order, gamma=gamma, spi=spi, **kwargs)
+        self.writer = FrameWriter(self.__apa102.write, len(self.__apa102.frame))
+        self.writer.start()
+
+
+    def set_led_color(self, led_num, red, green, blue, bright_percent=100):
+        self.__apa102.set_pixel(led_num, red, green, blue, bright_percent)
+
+
+    def fill_range(self, start, end, red, green, blue, bright_percent=100):
+        self.__apa102.set_pixel_range(start, end, red, green, blue, bright_percent)
+
+
+    def set_colors(self, colors, bright_percent=100):
+        self.__apa102.set_pixels(colors, bright_percent)
+
+
+    @property
+    def frame(self):
+        return self.__apa102.frame
+
+
+    @property
+    def frame_format(self) -> tuple:
+        apa102 = self.__apa102
+        return (type(self), self.num_led, tuple(apa102.rgb), apa102.global_brightness, apa102.gamma)
+
+
+    def write_frame(self):
+        self.writer.post(self.__apa102.frame)
+
+
+    def write(self, frame):
+        self.__apa102.write(frame)
+
+
+    def cleanup(self):
+        self.writer.stop()
+        self.__apa102.cleanup()
+        super().cleanup()
+
+
+# generic APA102 strip, e.g. apa102:num_led=300,bus=0,device=0
+LedController = Apa102LedController
@@ -0,0 +1,167 @@
+import errno
+import socket
+import time
+
+from ..base import AbstractLedController, FrameWriter
+
+# Distributed Display Protocol, http://www.3waylabs.com/ddp/
+DDP_PORT = 4048
+
+DDP_VERSION   = 0x40  # version 1
+DDP_PUSH      = 0x01  # set on the last packet of a frame, the device shows it
+DDP_TYPE_RGB8 = 0x0B  # RGB, 8 bit per channel
+DDP_DEFAULT_DESTINATION = 0x01
+
+DDP_HEADER_SIZE = 10
+
+# pixels per packet, keeps a packet below the Ethernet MTU
+PACKET_PIXELS = 480
+
+# frame rate limit of the device
+DEFAULT_FPS = 60
+
+
+class DDP:
+    """Sends frames with red, green and blue byte per pixel as DDP packets.
+
+    A frame is split into packets of PACKET_PIXELS pixels. The packets are
+    preallocated with their headers, a frame is copied into them and sent
+    without allocating anything.
+    """
+
+    def __init__(self, host, num_led, port=DDP_PORT, destination=DDP_DEFAULT_DESTINATION, packet_pixels=PACKET_PIXELS, sock=None):
+        self.num_led = num_led
+
+        # (packet, its pixel data, slice of the frame)
+        self.__parts = []
+        for offset in range(0, 3 * num_led, 3 * packet_pixels):
+            length = min(3 * packet_pixels, 3 * num_led - offset)
+            packet = bytearray(DDP_HEADER_SIZE + length)
+            packet[0] = DDP_VERSION
+            packet[2] = DDP_TYPE_RGB8
+            packet[3] = destination
+            packet[4:8]  = offset.to_bytes(4, "big")
+            packet[8:10] = length.to_bytes(2, "big")
+            self.__parts.append((packet, memoryview(packet)[DDP_HEADER_SIZE:], slice(offset, offset + length)))
+
+        self.packets = [packet for packet, _, _ in self.__parts]
+        if self.packets:
+            self.packets[-1][0] |= DDP_PUSH
+
+        self.sequence = 0
+
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.connect((host, port))
+        self.sock = sock
+
+        self.packets_sent = 0
+        self.send_errors  = 0
+
+    def write(self, frame):
+        """Sends a frame of 3 * num_led bytes"""
+        # sequence numbers 1 to 15, 0 means not used
+        self.sequence = self.sequence % 15 + 1
+
+        frame = memoryview(frame)
+        for packet, pixels, part in self.__parts:
+            packet[1] = self.sequence
+            pixels[:] = frame[part]
+            try:
+                self.sock.send(packet)
+                self.packets_sent += 1
+            except OSError as e:
+                # the device is not reachable (yet), the next frame tries again
+                if e.errno not in (errno.ECONNREFUSED, errno.EHOSTUNREACH, errno.ENETUNREACH, errno.ENOBUFS):
+                    raise
+                self.send_errors += 1
+
+    def cleanup(self):
+        self.sock.close()
+
+
+class LedController(AbstractLedController):
+    """LED controller for network LED controllers (e.g. WLED) using DDP over UDP.
+
+    Frames are sent by a FrameWriter thread at most fps times per second,
+    frames posted in between replace each other.
+    """
+
+    def __init__(self, host, num_led, port=DDP_PORT, fps=DEFAULT_FPS, destination=DDP_DEFAULT_DESTINATION, sock=None):
+        super().__init__()
+        self.num_led = int(num_led)
+        self.interval = 1.0 / float(fps)
+
+        # red, green and blue per LED, the format of the packets
+        self.__frame = bytearray(3 * self.num_led)
+        self.__brightness_luts = [None] * 101
+
+        self.ddp = DDP(host, self.num_led, int(port), int(destination), sock=sock)
+        self.__sent = None
+        self.writer = FrameWriter(self.write, len(self.__frame), name="led-ddp-writer")
+        self.writer.start()
+
+
+    def __lut(self, bright_percent):
+        if not 0 <= bright_percent <= 100:
+            # negative values would index the cache from the end
+            return bytes(max(0, min(255, int(value * bright_percent / 100))) for value in range(256))
+
+        try:
+            lut = self.__brightness_luts[bright_percent]
+        except TypeError:
+            # not an integer
+            return bytes(min(255, int(value * bright_percent / 100)) for value in range(256))
+
+        if lut is None:
+            lut = self.__brightness_luts[bright_percent] = bytes(value * bright_percent // 100 for value in range(256))
+        return lut
+
+
+    def set_led_color(self, led_num, red, green, blue, bright_percent=100):
+        if led_num < 0 or led_num >= self.num_led:
+            return
+
+        lut = self.__lut(bright_percent)
+        i = 3 * led_num
+        self.__frame[i]     = lut[red]
+        self.__frame[i + 1] = lut[green]
+        self.__frame[i + 2] = lut[blue]
+
+
+    def fill_range(self, start, end, red, green, blue, bright_percent=100):
+        start = max(start, 0)
+        end   = min(end, self.num_led)
+        if start < end:
+            self.__frame[3 * start : 3 * end] = bytes((red, green, blue)).translate(self.__lut(bright_percent)) * (end - start)
+
+
+    def set_colors(self, colors, bright_percent=100):
+        colors = memoryview(colors).cast("B")
+        count = min(len(colors) // 3, self.num_led)
+        self.__frame[: 3 * count] = colors[: 3 * count].tobytes().translate(self.__lut(bright_percent))
+
+
+    @property
+    def frame(self):
+        return self.__frame
+
+
+    def write_frame(self):
+        self.writer.post(self.__frame)
+
+
+    def write(self, frame):
+        # rate limit of the device, the writer thread waits
+        if self.__sent is not None:
+            delay = self.__sent + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.__sent = time.monotonic()
+        self.ddp.write(frame)
+
+
+    def cleanup(self):
+        self.writer.stop()
+        self.ddp.cleanup()
+        super().cleanup()
@@ -1,27 +1,227 @@
+import asyncio
+import struct
+import sys
+import threading
+import time
+
+from array import array
+
 from ..base import AbstractLedController
 
 NUM_LEDS = 12
 
 _BLACK = (0,0,0,0)
 
-class LedController(AbstractLedController):
+# redraws per second of the terminal sink
+TERMINAL_FPS = 10
+
+
+class PrintSink:
+    """Prints every frame as list of (red, green, blue, brightness)"""
+
+    def write(self, frame):
+        print([tuple(frame[i : i + 4]) for i in range(0, len(frame), 4)])
+
+    def close(self):
+        pass
+
+
+class CountingSink:
+    """Only counts the frames"""
+
     def __init__(self):
+        self.frames = 0
+        self.bytes  = 0
+
+    def write(self, frame):
+        self.frames += 1
+        self.bytes  += len(frame)
+
+    def close(self):
+        pass
+
+
+class TerminalSink:
+    """Draws the LEDs in one line with ANSI true colors, redrawn in place.
+
+    At most fps frames per second are drawn. A frame arriving earlier is
+    drawn when the interval has passed, so the last frame is always shown.
+    Frames may be written by the thread of a FrameWriter, e.g. in a
+    CompositeLedController, the pending frame is drawn by the event loop.
+    """
+
+    def __init__(self, num_led, fps=TERMINAL_FPS, stream=None):
+        self.interval = 1.0 / float(fps)
+        self.stream   = stream or sys.stdout
+        self.frame    = array("B", _BLACK * num_led)
+        self.__drawn   = None
+        self.__timer   = None
+        self.__pending = False
+        self.__lock    = threading.Lock()
+
+        # the loop drawing pending frames, also for writes from other threads
+        try:
+            self.__loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.__loop = None
+
+    def write(self, frame):
+        with self.__lock:
+            memoryview(self.frame)[:] = frame
+            now = time.monotonic()
+            if self.__drawn is None or now - self.__drawn >= self.interval:
+                self.__draw(now)
+                return
+            if self.__pending:
+                return
+
+            try:
+                self.__loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # not on the loop, the thread of a FrameWriter
+                if self.__loop is None or self.__loop.is_closed():
+                    return
+                self.__pending = True
+                self.__loop.call_soon_threadsafe(self.__schedule_pending)
+                return
+
+            self.__pending = True
+            self.__schedule_pending()
+
+    def __schedule_pending(self):
+        if not self.__pending:
+            # closed in the meantime
+            return
+        delay = self.__drawn + self.interval - time.monotonic()
+        self.__timer = asyncio.get_running_loop().call_later(max(delay, 0.0), self.__draw_pending)
+
+    def __draw_pending(self):
+        with self.__lock:
+            self.__timer   = None
+            self.__pending = False
+            self.__draw(time.monotonic())
+
+    def __draw(self, now):
+        self.__drawn = now
+        frame = self.frame
+        leds = []
+        for i in range(0, len(frame), 4):
+            brightness = frame[i + 3]
+            red, green, blue = (value * brightness // 100 for value in frame[i : i + 3])
+            leds.append(f"\x1b[38;2;{red};{green};{blue}m●")
+        self.stream.write("\r" + " ".join(leds) + "\x1b[0m\x1b[K")
+        self.stream.flush()
+
+    def close(self):
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        self.__pending = False
+        if self.__drawn is not None:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+# time.monotonic() and size of a recorded frame
+_RECORD_HEADER = struct.Struct("<dI")
+
+
+class RecordingSink:
+    """Appends every frame with its time to a binary file, see read_frames()"""
+
+    def __init__(self, file):
+        self.file = open(file, "ab")
+        self.__header = bytearray(_RECORD_HEADER.size)
+
+    def write(self, frame):
+        _RECORD_HEADER.pack_into(self.__header, 0, time.monotonic(), len(frame))
+        self.file.write(self.__header)
+        self.file.write(frame)
+
+    def close(self):
+        self.file.close()
+
+
+def read_frames(file):
+    """Yields (time, frame) of a file written by the record sink"""
+    with open(file, "rb") as f:
+        while header := f.read(_RECORD_HEADER.size):
+            t, size = _RECORD_HEADER.unpack(header)
+            yield t, f.read(size)
+
+
+def _percent(bright_percent):
+    # like the real controllers, brightness beyond 0..100 is saturated
+    return max(0, min(int(bright_percent), 100))
+
+
+def _default_sink():
+    # drawing to a terminal is readable, printing to a pipe or log is not
+    return "terminal" if sys.stdout.isatty() else "count"
+
+
+class LedController(AbstractLedController):
+    """Mock LED controller writing the frames to a sink.
+
+    sink is "terminal" (default on a terminal), "count" (default otherwise),
+    "print" or "record" with the option file.
+    """
+
+    def __init__(self, num_led=NUM_LEDS, sink=None, fps=TERMINAL_FPS, file=None):
         super().__init__()
-        self.num_led = NUM_LEDS
-        self._color = list()
-        for _ in range(self.num_led):
-            self._color.append(_BLACK)
+        self.num_led = int(num_led)
+        # red, green, blue, brightness per LED
+        self._color = array("B", _BLACK * self.num_led)
+
+        sink = sink or _default_sink()
+        if sink == "terminal":
+            self.sink = TerminalSink(self.num_led, fps)
+        elif sink == "count":
+            self.sink = CountingSink()
+        elif sink == "print":
+            self.sink = PrintSink()
+        elif sink == "record":
+            if file is None:
+                raise TypeError("sink record needs the option file")
+            self.sink = RecordingSink(file)
+        else:
+            raise TypeError(f"unknown sink {sink}")
 
 
     def set_led_color(self, led_num, red, green, blue, bright_percent=100):
         if led_num < 0 or led_num >= self.num_led:
             return
-        
-        self._color[led_num] = (red, green, blue, bright_percent)
 
-    def show(self):
-        print(self._color)
+        i = 4 * led_num
+        self._color[i]     = red
+        self._color[i + 1] = green
+        self._color[i + 2] = blue
+        self._color[i + 3] = _percent(bright_percent)
+
+    def fill_range(self, start, end, red, green, blue, bright_percent=100):
+        start = max(start, 0)
+        end   = min(end, self.num_led)
+        if start < end:
+            self._color[4 * start : 4 * end] = array("B", (red, green, blue, _percent(bright_percent))) * (end - start)
+
+    def set_colors(self, colors, bright_percent=100):
+        colors = memoryview(colors).cast("B")
+        count = min(len(colors) // 3, self.num_led)
+        self._color[3:4 * count:4] = array("B", (_percent(bright_percent),)) * count
+        for channel in range(3):
+            self._color[channel:4 * count:4] = array("B", colors[channel:3 * count:3].tobytes())
+
+    @property
+    def frame(self):
+        return self._color
+
+    def write_frame(self):
+        self.write(self._color)
+
+    def write(self, frame):
+        self.sink.write(frame)
 
     def cleanup(self):
+        self.sink.close()
         self._color = None
         super().cleanup()
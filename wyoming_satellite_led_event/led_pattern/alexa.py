@@ -1,5 +1,4 @@
-import asyncio
-from ..base import GenericLedPattern
+from ..base import GenericLedPattern, Animation, Keyframe
 
 _BLACK   = (0, 0, 0)
 _BLUE   = (0, 0, 255)
@@ -7,21 +6,70 @@ _RED    = (60, 0, 0)
 _YELLOW = (255, 255, 0)
 _WHITE  = (255, 255, 255)
 
+
+# Animations, compiled once per number of LEDs
+
+def _wakeup(num_led) -> Animation:
+    # sweep from the outside to the middle, white head with blue tail
+    steps = int(round(num_led / 2))
+    brightness_stepwidth = int(round(50/steps))
+    brightness = max(100 - brightness_stepwidth * steps, 0)
+
+    colors = [(*_BLACK, 100)] * num_led
+    keyframes = []
+    for i in range(steps):
+        brightness = min(brightness + brightness_stepwidth, 100)
+        colors[i] = colors[num_led - i - 1] = (*_WHITE, brightness)
+
+        if i >= 1:
+            colors[i - 1] = colors[num_led - i] = (*_BLUE, brightness)
+
+        keyframes.append(Keyframe(i * 0.02, tuple(colors)))
+
+    keyframes.append(Keyframe(steps * 0.02 + 0.5, tuple(colors)))
+    return Animation(keyframes)
+
+
+def _think(num_led) -> Animation:
+    # alternating blue and white
+    frames = [
+        tuple(_BLUE if (i + o) % 2 == 0 else _WHITE for i in range(num_led))
+        for o in (1, 0)
+    ]
+    return Animation([Keyframe(0.0, frames[0]), Keyframe(0.15, frames[1]), Keyframe(0.3, frames[0])], loop=True)
+
+
+def _speak(num_led) -> Animation:
+    # fade white -> blue -> white, 1 step per 2ms
+    return Animation([Keyframe(0.0, _WHITE), Keyframe(0.51, _BLUE), Keyframe(1.02, _WHITE)], loop=True, interpolate=True)
+
+
+def _error(num_led) -> Animation:
+    # flash red 3 times, ends red for the "off" animation
+    keyframes = [Keyframe(0.6 * i + 0.3 * j, (_RED, _BLACK)[j]) for i in range(3) for j in range(2)]
+    keyframes += [Keyframe(1.8, _RED), Keyframe(2.1, _RED)]
+    return Animation(keyframes)
+
+
+def _disconnected(num_led) -> Animation:
+    # pulsing red, 1% brightness per 40ms
+    return Animation([Keyframe(0.0, _RED, 40), Keyframe(1.52, _RED, 2), Keyframe(3.04, _RED, 40)], loop=True, interpolate=True)
+
+
 class LedPattern(GenericLedPattern):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._active = False;
+        self._active = False
 
     def color(self, red, green, blue, brightness = 100, show=True) -> None:
-        for i in range(self.led_controller.num_led):
-            self.led_controller.set_led_color(i, red, green, blue, brightness)
+        self.led_controller.fill(red, green, blue, brightness)
 
         if show:
             self.led_controller.show()
 
     async def client_connected(self) -> None:
         self.color(*_WHITE, 80)
-        await asyncio.sleep(0.5)
+        await self.sleep(0.5)
         await self.stop()
 
 
@@ -40,56 +88,15 @@ class LedPattern(GenericLedPattern):
         self._active = False
         middle = int(round(self.led_controller.num_led / 2))
         for i in range(middle):
-            self.led_controller.set_led_color(middle - i - 1, *_BLACK)
-            self.led_controller.set_led_color(middle + i,     *_BLACK)
+            self.led_controller.fill_range(middle - i - 1, middle + i + 1, *_BLACK)
 
             self.led_controller.show()
-            await asyncio.sleep(0.02)
-
-#        for i in range(int(round(self.led_controller.num_led / 2)) + 1):
-#            self.led_controller.set_led_color(i, *_BLACK)
-#            self.led_controller.set_led_color(self.led_controller.num_led - i, *_BLACK)
-#
-#            self.led_controller.show()
-#            await asyncio.sleep(0.02)
+            await self.sleep(0.02)
 
 
     async def wakeup(self) -> None:
         self._active = True
-
-        steps = int(round(self.led_controller.num_led / 2))
-        brightness_stepwidth = int(round(50/steps))
-        brightness = max(100 - brightness_stepwidth * steps, 0)
-
-        for i in range(steps):
-            brightness = min(brightness + brightness_stepwidth, 100)
-            self.led_controller.set_led_color(i, *_WHITE, brightness)
-            self.led_controller.set_led_color(self.led_controller.num_led - i - 1,  *_WHITE, brightness)
-
-            if i >= 1:
-                self.led_controller.set_led_color(i - 1, *_BLUE, brightness)
-                self.led_controller.set_led_color(self.led_controller.num_led - i, *_BLUE, brightness)
-
-            self.led_controller.show()
-            await asyncio.sleep(0.02)
-
-
-#        brightness = 50
-#        for i in range(int(round(self.led_controller.num_led / 2)) + 1):
-#            brightness += 5
-#            self.led_controller.set_led_color(i, *_WHITE, brightness)
-#            if i > 0:
-#                self.led_controller.set_led_color(self.led_controller.num_led - i,  *_WHITE, brightness)
-#
-#            if i > 1:
-#                self.led_controller.set_led_color(i - 2, *_BLUE, brightness)
-#                if i > 2:
-#                    self.led_controller.set_led_color(self.led_controller.num_led - i + 2, *_BLUE, brightness)
-#
-#            self.led_controller.show()
-#            await asyncio.sleep(0.02)
-
-        await asyncio.sleep(0.5)
+        await self.animate("wakeup", _wakeup)
 
 
     async def listen(self) -> None:
@@ -98,59 +105,17 @@ class LedPattern(GenericLedPattern):
 
     async def think(self) -> None:
         self._active = True
-
-        o = 0
-        while True:
-            o = (o + 1) % 2 #o = offset can be either zero or one and is used to switch between blue and white on the led for each iteration
-            for i in range(0, self.led_controller.num_led):
-                if (i + o) % 2 == 0:
-                    self.led_controller.set_led_color(i, *_BLUE)
-                else:
-                    self.led_controller.set_led_color(i, *_WHITE)
-
-            self.led_controller.show()
-            await asyncio.sleep(0.15)
+        await self.animate("think", _think)
 
 
     async def speak(self) -> None:
         self._active = True
-
-        direction = 1
-        val = 255
-
-        self.color(*_WHITE, show=False)
-
-        while True:
-            self.color(red=val, green=val, blue=255)
-
-            val -= direction
-            if val >= 255 or val <= 0:
-                direction *= -1
-
-            await asyncio.sleep(0.002)
+        await self.animate("speak", _speak)
 
 
     async def error(self) -> None:
-        for _ in range(3):
-            self.color(*_RED)
-            await asyncio.sleep(0.3)
-            self.color(*_BLACK)
-            await asyncio.sleep(0.3)
-        self.color(*_RED) # "off" Animation from red not black
-        await asyncio.sleep(0.3)
+        await self.animate("error", _error)
         await self.stop()
 
     async def disconnected(self) -> None:
-        step = 1
-        max_brightness = 40
-        min_brightness = 2
-
-        brightness = max_brightness
-
-        while True:
-            self.color(*_RED, brightness)
-            if brightness <= min_brightness or brightness >= max_brightness:
-                step = step * -1
-
-            brightness += step
-            await asyncio.sleep(0.04)
+        await self.animate("disconnected", _disconnected)
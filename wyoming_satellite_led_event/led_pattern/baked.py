@@ -0,0 +1,122 @@
+import mmap
+import struct
+
+from ..base import GenericLedPattern
+from ..base.animation import FrameTable
+
+# Baked pattern file, written by --bake (see bake.py), all little endian:
+#   header  : magic, version, number of entries, frame size, number of LEDs
+#   entries : name, loop flag, number of frames, offset of the frame data
+#   per entry at offset: float32 duration per frame, followed by the frames
+MAGIC   = b"WLED"
+VERSION = 1
+HEADER  = struct.Struct("<4sHHII")
+ENTRY   = struct.Struct("<24sB3xIQ")
+
+
+class LedPattern(GenericLedPattern):
+    """Plays pattern baked with --bake.
+
+    The file is memory mapped and the frames are copied from it into the
+    frame buffer of the LED controller, there is no color computation.
+    Use as led_controller/baked:file=<path>, the controller must be the
+    one the file has been baked for.
+    """
+
+    def __init__(self, *args, file : str, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        with open(file, "rb") as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.__tables = read_frame_tables(self.__mmap)
+        frame_size = len(self.led_controller.snapshot())
+        for name, table in self.__tables.items():
+            if table.frames and len(table.frames[0]) != frame_size:
+                self.__close()
+                raise ValueError(f"{file} has not been baked for this LED controller")
+
+
+    def __close(self):
+        # the frames are views into the mmap, it can only be closed without them
+        for table in self.__tables.values():
+            for frame in table.frames:
+                frame.release()
+            table.durations.release()
+        self.__tables = {}
+        self.__mmap.close()
+
+
+    def cleanup(self):
+        self.__close()
+        super().cleanup()
+
+
+    async def __play(self, name):
+        # states without frames (e.g. one that only passes) show nothing
+        table = self.__tables.get(name)
+        if table and table.frames:
+            await table.play(self.led_controller, lambda: self.frame_interval)
+
+
+    async def idle(self) -> None:
+        await self.__play("idle")
+
+    async def disconnected(self) -> None:
+        await self.__play("disconnected")
+
+    async def wakeup(self) -> None:
+        await self.__play("wakeup")
+
+    async def listen(self) -> None:
+        await self.__play("listen")
+
+    async def think(self) -> None:
+        await self.__play("think")
+
+    async def speak(self) -> None:
+        await self.__play("speak")
+
+    async def error(self) -> None:
+        await self.__play("error")
+
+    async def client_connected(self) -> None:
+        await self.__play("client_connected")
+
+    async def client_disconnected(self) -> None:
+        await self.__play("client_disconnected")
+
+
+def read_frame_tables(buffer) -> dict:
+    """Returns the frame tables by name of a baked file, the frames are
+    memoryviews into buffer."""
+    data = memoryview(buffer)
+    magic, version, count, frame_size, _ = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a baked pattern file")
+
+    tables = {}
+    for i in range(count):
+        name, loop, frame_count, offset = ENTRY.unpack_from(data, HEADER.size + i * ENTRY.size)
+        durations = data[offset : offset + 4 * frame_count].cast("f")
+        offset += 4 * frame_count
+        frames = [data[offset + n * frame_size : offset + (n + 1) * frame_size] for n in range(frame_count)]
+        tables[name.rstrip(b"\0").decode()] = FrameTable(frames, durations, bool(loop))
+
+    return tables
+
+
+def write_frame_tables(file, tables : dict, num_led : int):
+    """Writes frame tables by name into a binary file object"""
+    frame_size = len(next((t.frames[0] for t in tables.values() if t.frames), b""))
+    file.write(HEADER.pack(MAGIC, VERSION, len(tables), frame_size, num_led))
+
+    offset = HEADER.size + len(tables) * ENTRY.size
+    for name, table in tables.items():
+        file.write(ENTRY.pack(name.encode(), table.loop, len(table.frames), offset))
+        offset += len(table.frames) * (4 + frame_size)
+
+    for table in tables.values():
+        file.write(struct.pack(f"<{len(table.durations)}f", *table.durations))
+        for frame in table.frames:
+            file.write(frame)
@@ -22,9 +22,7 @@ _GREEN = (0, 255, 0)
 
 class LedPattern(GenericLedPattern):
     def color(self, rgb: Tuple[int, int, int]) -> None:
-        for i in range(self.led_controller.num_led):
-            self.led_controller.set_led_color(i, *rgb)
-
+        self.led_controller.fill(*rgb)
         self.led_controller.show()
 
 
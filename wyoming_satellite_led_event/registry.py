@@ -0,0 +1,103 @@
+# Registry of the LED controllers and patterns
+#
+# The included ones are listed by name with their module and description,
+# so listing them imports nothing. A module is imported when its class is
+# loaded. Other packages can add controllers and pattern with entry points
+# in the groups of ENTRY_POINT_GROUPS pointing to the class, e.g.
+#
+#   [project.entry-points."wyoming_satellite_led_event.led_pattern"]
+#   rainbow = "my_package.rainbow:LedPattern"
+#
+# Modules placed in the led_controller or led_pattern package are found by
+# their name as well, without being listed.
+
+from typing import Dict, Tuple
+
+_PCK_NAME = "wyoming_satellite_led_event"
+
+LED_CONTROLLER = "led_controller"
+LED_PATTERN    = "led_pattern"
+
+# kind -> name -> (module, description), the class is always LedController or LedPattern
+_INCLUDED : Dict[str, Dict[str, Tuple[str, str]]] = {
+    LED_CONTROLLER : {
+        "respeaker_4mic" : (".led_controller.respeaker_4mic", "ReSpeaker 4 Mic HAT"),
+        "respeaker_2mic" : (".led_controller.respeaker_2mic", "ReSpeaker 2 Mic HAT"),
+        "apa102"         : (".led_controller.apa102",         "APA102 strip on SPI, options num_led, bus, device, max_speed_hz"),
+        "mock"           : (".led_controller.mock",           "Mock LED Controller for testing / development purposes"),
+        "ddp"            : (".led_controller.ddp",            "network LED controller (e.g. WLED) over UDP with DDP, options host, num_led"),
+    },
+    LED_PATTERN : {
+        "default" : (".led_pattern.default", "default pattern from wyoming-satellite"),
+        "alexa"   : (".led_pattern.alexa",   "Alexa like model (modified)"),
+        "baked"   : (".led_pattern.baked",   "plays a file created with --bake, option file"),
+    },
+}
+
+_CLASS_NAMES = {
+    LED_CONTROLLER : "LedController",
+    LED_PATTERN    : "LedPattern",
+}
+
+ENTRY_POINT_GROUPS = {
+    LED_CONTROLLER : f"{_PCK_NAME}.{LED_CONTROLLER}",
+    LED_PATTERN    : f"{_PCK_NAME}.{LED_PATTERN}",
+}
+
+
+def _entry_points(kind : str) -> dict:
+    # importlib.metadata scans the installed distributions, only done on demand
+    from importlib.metadata import entry_points
+    return {entry_point.name: entry_point for entry_point in entry_points(group=ENTRY_POINT_GROUPS[kind])}
+
+
+def _modules(kind : str) -> Dict[str, str]:
+    # modules of the package of kind, found without importing them
+    import pkgutil
+    from importlib import import_module
+    package = import_module(f".{kind}", _PCK_NAME)
+    return {
+        module.name: f".{kind}.{module.name}"
+        for module in pkgutil.iter_modules(package.__path__)
+        if not module.name.startswith("_")
+    }
+
+
+def available(kind : str, plugins : bool = True) -> Dict[str, str]:
+    """Names and descriptions of the controllers or pattern, without importing them"""
+    result = {name: description for name, (_, description) in _INCLUDED[kind].items()}
+    if plugins:
+        for name, entry_point in _entry_points(kind).items():
+            result.setdefault(name, entry_point.value)
+        for name, module in _modules(kind).items():
+            result.setdefault(name, _PCK_NAME + module)
+    return result
+
+
+def load(kind : str, name : str):
+    """Imports and returns the class of a controller or pattern.
+
+    Raises LookupError if there is none with this name.
+    """
+    included = _INCLUDED[kind].get(name)
+    if included is not None:
+        from importlib import import_module
+        return getattr(import_module(included[0], _PCK_NAME), _CLASS_NAMES[kind])
+
+    entry_point = _entry_points(kind).get(name)
+    if entry_point is not None:
+        return entry_point.load()
+
+    # a module in the package, which is not listed
+    if not name.isidentifier():
+        raise LookupError(name)
+
+    from importlib import import_module
+    module = f"{_PCK_NAME}.{kind}.{name}"
+    try:
+        return getattr(import_module(module), _CLASS_NAMES[kind])
+    except ModuleNotFoundError as e:
+        # a module missing in the imported one is an error of it
+        if e.name != module:
+            raise
+        raise LookupError(name) from None
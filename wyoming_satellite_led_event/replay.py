@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Replays Wyoming events recorded with --record against a LED pattern
+#
+#   python -m wyoming_satellite_led_event.replay --led-pattern mock/default events.jsonl
+#
+# --speed replays N times faster or with "max" without any delay between
+# the events, --virtual replays with virtual time and takes no wall clock time.
+
+import argparse
+import asyncio
+import logging
+import time
+
+from typing import List, Tuple
+
+from .base import AbstractLedPattern, LedPatternRunner, VirtualTimeEventLoop, DEFAULT_FPS
+from .event_log import read_events
+
+_LOGGER = logging.getLogger()
+
+# time to let the last state start after the last event
+SETTLE_TIME = 1.0
+
+
+async def replay_events(runner : LedPatternRunner, events : List[Tuple], speed : float):
+    """Feeds (time, event) into the runner at speed times the recorded rate, speed 0 is as fast as possible"""
+    loop  = asyncio.get_running_loop()
+    start = loop.time()
+    first = events[0][0] if events else 0.0
+
+    for t, event in events:
+        if speed:
+            delay = start + (t - first) / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await runner.handle_event(event)
+
+    await asyncio.sleep(SETTLE_TIME)
+
+
+def replay(pattern : AbstractLedPattern, path : str, fps : float = DEFAULT_FPS, speed : float = 1.0, virtual : bool = False) -> dict:
+    """Replays the log, returns a report with the state changes, frames, event wait and processing times"""
+    events = list(read_events(path))
+    loop = VirtualTimeEventLoop() if virtual else asyncio.new_event_loop()
+    controller = getattr(pattern, "led_controller", None)
+
+    states = []
+    runner = None
+
+    async def run():
+        nonlocal runner
+        runner = LedPatternRunner(pattern, fps)
+        runner.state_changed = lambda state: states.append((loop.time() - start, state))
+        runner.setup()
+        try:
+            await replay_events(runner, events, speed)
+        finally:
+            runner.cleanup()
+
+    wall  = time.perf_counter()
+    start = loop.time()
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    def per_type(histogram):
+        return {
+            labels["type"] : (histogram.count(**labels), histogram.sum(**labels) / histogram.count(**labels))
+            for labels in histogram.labels()
+        }
+
+    return {
+        "events"    : len(events),
+        "recorded"  : events[-1][0] - events[0][0] if events else 0.0,
+        "wall_time" : time.perf_counter() - wall,
+        "states"    : states,
+        "frames_shown"   : controller.frames_shown if controller else 0,
+        "frames_skipped" : controller.frames_skipped if controller else 0,
+        "event_wait"       : per_type(runner.registry.metrics["led_event_wait_seconds"]),
+        "event_processing" : per_type(runner.registry.metrics["led_event_processing_seconds"]),
+    }
+
+
+def print_report(report : dict):
+    print(f"Replayed {report['events']} events in {report['wall_time']:.3f}s ({report['recorded']:.3f}s recorded)")
+    print(f"Frames: {report['frames_shown']} shown, {report['frames_skipped']} unchanged")
+    print("States:")
+    for t, state in report["states"]:
+        print(f"  {t:10.3f} {state.name}")
+    print(f"Events:{'count':>25}  {'wait':>11}  {'processing':>11}")
+    processing = report["event_processing"]
+    for event_type, (count, wait) in sorted(report["event_wait"].items()):
+        # processing is observed when the state started, not for events still collected
+        processed = f"{processing[event_type][1] * 1000:8.3f} ms" if event_type in processing else f"{'-':>11}"
+        print(f"  {event_type:<24} {count:>6}  {wait * 1000:8.3f} ms  {processed}")
+
+
+def main():
+    from .__main__ import create_led_pattern
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log", help="Event log written with --record")
+    parser.add_argument("--led-pattern", required=True, help="LED Pattern to use in format led_controller/pattern")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="Maximum number of frames per second written to the LEDs")
+    parser.add_argument("--speed", default="1", help="Replay N times faster than recorded or 'max' without delays")
+    parser.add_argument("--virtual", action="store_true", help="Replay with virtual time")
+    parser.add_argument("--debug", action="store_true", help="Log DEBUG messages")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+    led_pattern = create_led_pattern(args.led_pattern)
+    led_pattern.setup()
+    print_report(replay(led_pattern, args.log, args.fps, speed, args.virtual))
+
+
+if __name__ == "__main__":
+    main()
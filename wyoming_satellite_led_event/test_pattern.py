@@ -3,7 +3,7 @@
 #ToDo - test against real sequences of events from wyoming protocol
 
 import asyncio
-from .base import AbstractLedPattern, LedPatternRunner
+from .base import AbstractLedPattern, LedPatternRunner, Profiler, RecordingLedController, VirtualTimeEventLoop, DEFAULT_FPS
 
 from wyoming.event import Event
 from wyoming.pipeline import RunPipeline,PipelineStage
@@ -98,27 +98,65 @@ async def test_cancelled_command(runner : LedPatternRunner):
 
 
 
-async def test_pattern(pattern : AbstractLedPattern):
-    runner = LedPatternRunner(pattern)
+async def run_scenarios(runner : LedPatternRunner):
+    print("Connected")
+    await runner.handle_event(SatelliteConnected().event())
+    await asyncio.sleep(3)
+
+    await test_successfull(runner)
+    await asyncio.sleep(3)
+
+    await test_erroneous(runner)
+    await asyncio.sleep(5)
+
+    await test_cancelled_command(runner)
+    await asyncio.sleep(5)
+
+    print("Disconnected")
+    await runner.handle_event(SatelliteDisconnected().event())
+    await asyncio.sleep(5)
+
+
+
+async def test_pattern(pattern : AbstractLedPattern, fps : float = DEFAULT_FPS, runner : LedPatternRunner = None):
+    """Runs the scenarios in real time, with runner if given, e.g. with the options of the command line"""
+    if runner is None:
+        runner = LedPatternRunner(pattern, fps)
     runner.setup()
 
     try:
-        print("Connected")
-        await runner.handle_event(SatelliteConnected().event())
-        await asyncio.sleep(3)
+        await run_scenarios(runner)
+    finally:
+        runner.cleanup()
+
 
-        await test_successfull(runner)
-        await asyncio.sleep(3)
 
-        await test_erroneous(runner)
-        await asyncio.sleep(5)
+def fast_forward(pattern : AbstractLedPattern, fps : float = DEFAULT_FPS, scenarios = run_scenarios, transitions : dict = None, profiler : Profiler = None):
+    """Runs the scenarios with virtual time, they take no wall clock time.
 
-        await test_cancelled_command(runner)
-        await asyncio.sleep(5)
+    Returns the state changes as (time, state) and the frames shown as
+    (time, frame) in the format of the pattern's controller. transitions
+    and profiler are passed to the runner.
+    """
+    loop = VirtualTimeEventLoop()
+    recorder = RecordingLedController(pattern.led_controller, loop.time)
+    pattern.led_controller = recorder
 
-        print("Disconnected")
-        await runner.handle_event(SatelliteDisconnected().event())
-        await asyncio.sleep(5)
-        pattern.cleanup()
+    states = []
+
+    async def run():
+        runner = LedPatternRunner(pattern, fps, transitions, profiler=profiler)
+        runner.state_changed = lambda state: states.append((loop.time(), state))
+        runner.setup()
+        try:
+            await scenarios(runner)
+        finally:
+            runner.cleanup()
+
+    try:
+        loop.run_until_complete(run())
     finally:
-        runner.cleanup()
\ No newline at end of file
+        pattern.led_controller = recorder.led_controller
+        loop.close()
+
+    return states, recorder.frames